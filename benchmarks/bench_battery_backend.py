@@ -0,0 +1,72 @@
+"""
+Battery backend micro-benchmark
+Compares reads/sec and allocations per read of the sysfs and psutil backends
+
+Usage: python -m benchmarks.bench_battery_backend [--reads N] [--sysfs-root PATH]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from src.core.battery_backends import PsutilBackend, SysfsBackend
+from src.core.power_events import SYSFS_POWER_SUPPLY
+
+
+def bench_backend(backend, reads):
+    """Measure read throughput and allocations of a single backend"""
+    backend.read()  # warm up
+
+    started = time.perf_counter()
+    for _ in range(reads):
+        backend.read()
+    elapsed = time.perf_counter() - started
+
+    # Peak memory allocated while a read is in flight, averaged over several reads
+    tracemalloc.start()
+    peak_total = 0
+    samples = min(reads, 1000)
+    for _ in range(samples):
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        backend.read()
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += max(peak - baseline, 0)
+    tracemalloc.stop()
+
+    return {
+        'backend': backend.name,
+        'reads_per_sec': reads / elapsed,
+        'us_per_read': elapsed / reads * 1e6,
+        'peak_bytes_per_read': peak_total / samples,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reads', type=int, default=10000)
+    parser.add_argument('--sysfs-root', default=SYSFS_POWER_SUPPLY,
+                        help='power_supply directory, e.g. a fake tree on machines without a battery')
+    args = parser.parse_args()
+
+    backends = []
+    sysfs = SysfsBackend(args.sysfs_root)
+    if sysfs.read() is not None:
+        backends.append(sysfs)
+    else:
+        print(f"sysfs: no battery under {args.sysfs_root}, skipped")
+    try:
+        backends.append(PsutilBackend())
+    except ImportError:
+        print("psutil: not installed, skipped")
+
+    for backend in backends:
+        result = bench_backend(backend, args.reads)
+        print(f"{result['backend']:>8}: {result['reads_per_sec']:>10.0f} reads/s  "
+              f"{result['us_per_read']:>8.2f} us/read  "
+              f"{result['peak_bytes_per_read']:>8.0f} B allocated/read")
+        backend.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Core runtime footprint benchmark
+Runs the monitor and watchers as the GUI does and reports threads, wakeups and RSS
+
+Usage: python -m benchmarks.bench_core_loop [--seconds N] [--sysfs-root PATH]
+
+Also runs on checkouts from before the core loop existed (threads started directly),
+to compare both designs on the same machine.
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import tempfile
+import threading
+import time
+
+from src.core.battery import battery_sampler
+from src.core.battery_backends import SysfsBackend
+from src.core.config import ConfigManager
+from src.core.config_watcher import ConfigWatcher
+from src.core.monitor import BatteryMonitor
+from src.core.signals import MonitorSignals
+
+try:
+    from src.core.loop import core_loop
+except ImportError:
+    core_loop = None
+
+
+def make_fake_battery():
+    """Create a plugged-in battery under a temporary power_supply tree, returns its root"""
+    root = tempfile.mkdtemp(prefix='bench_power_supply_')
+    for name, attrs in (('BAT0', {'type': 'Battery', 'status': 'Charging', 'capacity': '80',
+                                  'energy_now': '40000000', 'power_now': '10000000'}),
+                        ('AC', {'type': 'Mains', 'online': '1'})):
+        os.mkdir(os.path.join(root, name))
+        for attr, value in attrs.items():
+            with open(os.path.join(root, name, attr), 'w') as f:
+                f.write(value + '\n')
+    return root
+
+
+def os_threads():
+    """Threads of this process as seen by the OS (Linux), None elsewhere"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('Threads:'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+
+def rss_kib():
+    """Current resident set size in KiB (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=60)
+    parser.add_argument('--sysfs-root', default=None,
+                        help='power_supply directory, a fake plugged-in battery is created by default')
+    args = parser.parse_args()
+
+    fake_root = None if args.sysfs_root else make_fake_battery()
+    battery_sampler.set_backend(SysfsBackend(args.sysfs_root or fake_root))
+
+    config_manager = ConfigManager()
+    config_manager.set('enabled', True)  # not saved, only the running policy changes
+
+    rss_before = rss_kib()
+    if core_loop is not None:
+        core_loop.start_thread()
+    monitor = BatteryMonitor(config_manager, MonitorSignals())
+    watcher = ConfigWatcher(config_manager)
+    monitor.start()
+    watcher.start()
+    time.sleep(0.5)  # let everything settle before counting
+
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    wakeups_before = monitor.wakeups
+    time.sleep(args.seconds)
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+
+    print(f"design:             {'asyncio core loop' if core_loop is not None else 'one thread per component'}")
+    print(f"python threads:     {threading.active_count()} ({', '.join(t.name for t in threading.enumerate())})")
+    print(f"os threads:         {os_threads()}")
+    print(f"monitor wakeups:    {monitor.wakeups - wakeups_before} in {args.seconds:.0f} s")
+    print(f"context switches:   {usage_after.ru_nvcsw - usage_before.ru_nvcsw} voluntary, "
+          f"{usage_after.ru_nivcsw - usage_before.ru_nivcsw} involuntary")
+    print(f"cpu time:           {(usage_after.ru_utime + usage_after.ru_stime - usage_before.ru_utime - usage_before.ru_stime) * 1000:.1f} ms")
+    print(f"rss:                {rss_kib()} KiB ({rss_kib() - rss_before:+d} KiB after starting the core)")
+    if monitor.power_watcher is not None:
+        print(f"power watcher:      {monitor.power_watcher.stats()}")
+
+    monitor.stop()
+    watcher.stop()
+    if core_loop is not None:
+        core_loop.stop()
+    if fake_root:
+        shutil.rmtree(fake_root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""
+GUI latency budget check
+Times MainWindow startup, dialog opening and the shutdown signal-to-dialog round trip
+offscreen, and fails when a budget is exceeded
+
+Usage: python -m benchmarks.bench_gui_latency [--runs N] [--idle SECONDS] [--output FILE]
+
+Runs with QT_QPA_PLATFORM=offscreen, a fake battery and a scratch home directory,
+so it works on CI machines without a display or a battery.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+# Result name -> budget in ms
+BUDGETS = {
+    'main_window_startup': 500,
+    'settings_dialog_open': 150,
+    'help_dialog_open': 150,
+    'shutdown_dialog_open': 100,
+    # Safety-critical: from the monitor emitting shutdown_triggered to the warning being shown
+    'shutdown_signal_to_visible_cold': 300,
+    'shutdown_signal_to_visible': 50,
+    'idle_max_stall': 50,
+}
+ROUND_TRIP_TIMEOUT = 5  # seconds
+
+
+def scratch_home():
+    """Point the app's config and telemetry at a temporary home directory, returns it"""
+    home = tempfile.mkdtemp(prefix='bench_gui_home_')
+    os.environ['HOME'] = home
+    os.environ['USERPROFILE'] = home
+    os.mkdir(os.path.join(home, '.win_power_control'))
+    with open(os.path.join(home, '.win_power_control', 'config.json'), 'w', encoding='utf-8') as f:
+        json.dump({'enabled': False, 'sound_enabled': False, 'language': 'en'}, f)
+    return home
+
+
+def fake_backend():
+    """Battery backend that always reports 80% on battery power"""
+    from src.core.replay import ReplayBackend, TraceSample
+    return ReplayBackend([TraceSample(0.0, 80.0, False)], time)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help='warm runs per measurement, the median is reported')
+    parser.add_argument('--idle', type=float, default=3.0, help='seconds of idle time watched for main-thread stalls')
+    parser.add_argument('--output', help='write results to this JSON file')
+    args = parser.parse_args()
+
+    try:
+        from PyQt5.QtCore import QEvent, QEventLoop, QObject, Qt, QTimer
+        from PyQt5.QtWidgets import QApplication
+    except ImportError as e:
+        print(f"SKIP: {e}")
+        return 0
+
+    scratch_home()
+    import src.gui.main_window as main_window_module
+    from src.core.loop import core_loop
+
+    # MainWindow picks the backend from the config, hand it the fake one instead
+    backend = fake_backend()
+    main_window_module.create_backend = lambda name: backend
+
+    app = QApplication(sys.argv)
+    app.setQuitOnLastWindowClosed(False)
+
+    class ShowWatcher(QObject):
+        """Records when a dialog with the given class name is shown and dismisses it right away
+
+        Matching by name keeps the watcher from importing the dialog module itself.
+        """
+
+        def __init__(self, class_name):
+            super().__init__()
+            self.class_name = class_name
+            self.shown_at = None
+
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Show and type(obj).__name__ == self.class_name and self.shown_at is None:
+                self.shown_at = time.perf_counter()
+                QTimer.singleShot(0, obj.reject)
+            return False
+
+    class StallMonitor(QObject):
+        """Precise timer on the GUI thread, a late tick means the thread was blocked"""
+
+        INTERVAL_MS = 5
+
+        def __init__(self):
+            super().__init__()
+            self.timer = QTimer(self)
+            self.timer.setTimerType(Qt.PreciseTimer)
+            self.timer.timeout.connect(self.tick)
+            self.last = None
+            self.max_stall = 0.0
+
+        def start(self):
+            self.last = time.perf_counter()
+            self.timer.start(self.INTERVAL_MS)
+
+        def tick(self):
+            now = time.perf_counter()
+            self.max_stall = max(self.max_stall, now - self.last - self.INTERVAL_MS / 1000)
+            self.last = now
+
+    def ms_since(started):
+        return (time.perf_counter() - started) * 1000
+
+    def open_and_close(factory):
+        """Construct a dialog, show it and let it paint, returns ms"""
+        started = time.perf_counter()
+        dialog = factory()
+        dialog.show()
+        app.processEvents()
+        elapsed = ms_since(started)
+        dialog.close()
+        dialog.deleteLater()
+        app.processEvents()
+        return elapsed
+
+    def signal_round_trip():
+        """Emit shutdown_triggered from the core loop like the monitor does, returns ms until the dialog is shown"""
+        watcher = ShowWatcher('ShutdownDialog')
+        app.installEventFilter(watcher)
+        emitted = []
+
+        def emit():
+            emitted.append(time.perf_counter())
+            window.signals.shutdown_triggered.emit()
+
+        core_loop.call_soon(emit)
+        deadline = time.perf_counter() + ROUND_TRIP_TIMEOUT
+        while watcher.shown_at is None and time.perf_counter() < deadline:
+            app.processEvents(QEventLoop.AllEvents | QEventLoop.WaitForMoreEvents, 50)
+        app.removeEventFilter(watcher)
+        if watcher.shown_at is None or not emitted:
+            raise RuntimeError("shutdown dialog was not shown")
+        return (watcher.shown_at - emitted[0]) * 1000
+
+    def open_settings():
+        from src.gui.settings_dialog import SettingsDialog
+        return SettingsDialog(window, window.config_manager)
+
+    def open_help():
+        from src.gui.help_dialog import HelpDialog
+        return HelpDialog(window)
+
+    def open_shutdown():
+        from src.gui.shutdown_dialog import ShutdownDialog
+        return ShutdownDialog(window, False)
+
+    runs = {}  # result name -> list of ms
+
+    started = time.perf_counter()
+    window = main_window_module.MainWindow()
+    window.show()
+    app.processEvents()
+    runs['main_window_startup'] = [ms_since(started)]
+
+    # Before the scheduled preload: the dialog module is imported on the way
+    if 'src.gui.shutdown_dialog' in sys.modules:
+        raise RuntimeError("shutdown dialog module already imported, the cold round trip would be warm")
+    runs['shutdown_signal_to_visible_cold'] = [signal_round_trip()]
+    window.preload_shutdown_dialog()
+    runs['shutdown_signal_to_visible'] = [signal_round_trip() for _ in range(args.runs)]
+
+    for name, factory in (('settings_dialog_open', open_settings), ('help_dialog_open', open_help),
+                          ('shutdown_dialog_open', open_shutdown)):
+        runs[name + '_cold'] = [open_and_close(factory)]
+        runs[name] = [open_and_close(factory) for _ in range(args.runs)]
+
+    # Idle with the status timer running and a settings change half way through
+    stalls = StallMonitor()
+    stalls.start()
+    loop = QEventLoop()
+    QTimer.singleShot(int(args.idle * 500), lambda: window.config_manager.set('enabled', True))
+    QTimer.singleShot(int(args.idle * 1000), loop.quit)
+    loop.exec_()
+    runs['idle_max_stall'] = [stalls.max_stall * 1000]
+
+    window.quit_application()
+
+    # Budgets apply to the median, same as what is written to the JSON file
+    failed = False
+    for name, values in runs.items():
+        value = statistics.median(values)
+        budget = BUDGETS.get(name)
+        status = '' if budget is None else ('OK' if value <= budget else 'FAIL')
+        failed = failed or status == 'FAIL'
+        print(f"{status:4} {name:34} {value:8.1f} ms" + (f" (budget {budget} ms)" if budget is not None else ""))
+
+    if args.output:
+        from benchmarks.suite import environment
+        report = {'environment': environment(),
+                  'results': {name: {'unit': 'ms', 'median': statistics.median(values), 'min': min(values),
+                                     'number': 1, 'repeat': len(values)}
+                              for name, values in runs.items()}}
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"Results written to {args.output}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Startup import-time budget check
+Parses `python -X importtime` output and fails when a budget is exceeded or a
+lazily loaded module is imported at startup
+
+Usage: python -m benchmarks.bench_import_time [--runs N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry module -> (budget in ms of cumulative import time, modules that must not be imported)
+BUDGETS = {
+    'src.gui.main_window': (400, (
+        'src.gui.settings_dialog',
+        'src.gui.help_dialog',
+        'src.gui.shutdown_dialog',
+        'src.gui.error_dialog',
+        'src.i18n.help_content',
+        'src.utils.system',
+        'src.core.config_watcher',
+        'src.core.control',
+        'src.core.exporter',
+        'src.core.hooks',
+    )),
+    'src.core.daemon': (150, (
+        'PyQt5',
+        'src.i18n.help_content',
+        'src.core.config_watcher',
+        'src.core.control',
+        'src.core.exporter',
+        'src.core.hooks',
+    )),
+}
+
+
+def measure_import(module):
+    """Import module in a fresh interpreter, returns ({module: cumulative_us}, top-level cumulative_us)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times, times.get(module, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='best of N runs is compared to the budget')
+    args = parser.parse_args()
+
+    failed = False
+    for module, (budget_ms, forbidden) in BUDGETS.items():
+        try:
+            runs = [measure_import(module) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"SKIP {module}: {e.args[0].splitlines()[-1]}")
+            continue
+
+        times, _ = runs[0]
+        best_ms = min(total for _, total in runs) / 1000
+        loaded = [name for name in forbidden if any(m == name or m.startswith(name + '.') for m in times)]
+
+        status = 'OK'
+        if best_ms > budget_ms or loaded:
+            status = 'FAIL'
+            failed = True
+        print(f"{status:4} {module}: {best_ms:.1f} ms (budget {budget_ms} ms)")
+        for name in loaded:
+            print(f"     {name} is imported at startup")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
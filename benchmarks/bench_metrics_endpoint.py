@@ -0,0 +1,117 @@
+"""
+Metrics endpoint load test
+Scrapes the Prometheus endpoint as fast as possible and reports latency, the server's
+CPU cost per scrape, the core loop's worst stall and sensor reads caused by scraping
+
+Usage: python -m benchmarks.bench_metrics_endpoint [--scrapes N] [--clients N]
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import sys
+import threading
+import time
+
+from benchmarks.suite import discharging_monitor
+from src.core.exporter import MetricsExporter
+from src.core.loop import core_loop
+
+STALL_INTERVAL = 0.005  # seconds between ticks of the loop stall probe
+
+
+def scrape(port):
+    """One GET /metrics over a new connection, returns (seconds, body)"""
+    started = time.perf_counter()
+    with socket.create_connection(('127.0.0.1', port)) as sock:
+        sock.sendall(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    response = b''.join(chunks)
+    if not response.startswith(b'HTTP/1.1 200'):
+        raise RuntimeError(f"unexpected response: {response[:80]!r}")
+    return time.perf_counter() - started, response.split(b'\r\n\r\n', 1)[1]
+
+
+async def loop_thread_time():
+    """CPU time used so far by the core loop thread"""
+    return time.thread_time()
+
+
+async def stall_probe(stalls, stop):
+    """Tick on the core loop, a late tick means something blocked the loop"""
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(STALL_INTERVAL)
+        now = time.perf_counter()
+        stalls.append(now - last - STALL_INTERVAL)
+        last = now
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scrapes', type=int, default=5000, help='total number of requests')
+    parser.add_argument('--clients', type=int, default=4, help='concurrent scraping threads')
+    args = parser.parse_args()
+
+    # Monitor in the middle of a discharge with the shutdown timer running
+    monitor, clock, source = discharging_monitor()
+    core_loop.start_thread()
+    exporter = MetricsExporter(monitor, monitor.config_manager, 0)
+    exporter.start()
+    deadline = time.perf_counter() + 5
+    while exporter.bound_port is None and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    if exporter.bound_port is None:
+        print("FAIL: endpoint did not start")
+        return 1
+    port = exporter.bound_port
+
+    _, body = scrape(port)
+    print(body.decode('ascii'), end='')
+    reads_before = source.read_count
+
+    stalls, stop = [], threading.Event()
+    core_loop.spawn(stall_probe(stalls, stop))
+    latencies = []
+    per_client = args.scrapes // args.clients
+
+    def client():
+        for _ in range(per_client):
+            latencies.append(scrape(port)[0])
+
+    cpu_before = core_loop.spawn(loop_thread_time()).result()
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    cpu = core_loop.spawn(loop_thread_time()).result() - cpu_before
+    stop.set()
+    exporter.stop()
+    core_loop.stop()
+
+    count = len(latencies)
+    latencies.sort()
+    print(f"\n{count} scrapes from {args.clients} clients in {elapsed:.2f} s ({count / elapsed:.0f}/s)")
+    print(f"latency: median {statistics.median(latencies) * 1000:.2f} ms, "
+          f"p99 {latencies[int(count * 0.99) - 1] * 1000:.2f} ms, max {latencies[-1] * 1000:.2f} ms")
+    print(f"core loop CPU: {cpu / count * 1e6:.1f} us per scrape "
+          f"({cpu / elapsed * 100:.0f}% of one core at this rate, "
+          f"{cpu / count * 100 / 15:.5f}% at one scrape per 15 s)")
+    print(f"rendered {exporter.renders} times for {exporter.scrapes} scrapes")
+    print(f"core loop max stall under load: {max(stalls) * 1000:.2f} ms")
+    sensor_reads = source.read_count - reads_before
+    print(f"sensor reads during the test: {sensor_reads}")
+    return 1 if sensor_reads else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Trace replay benchmark
+Replays a full-day trace and a grid of synthetic scenarios through BatteryMonitor
+
+Usage: python -m benchmarks.bench_replay [--scenarios N]
+"""
+
+import argparse
+import itertools
+import time
+
+from src.core.replay import ReplayHarness, synthetic_trace
+
+
+DAY = 24 * 3600
+DELAYS = (1, 5, 15, 30, 60)
+THRESHOLDS = (10, 25, 50, 75, 90)
+DRAIN_RATES = (-5, -10, -20, -40, -80)  # percent per hour
+UNPLUG_AFTER = (0, 600, 3600, 4 * 3600)
+
+
+def full_day_trace():
+    """Plugged in, a morning on battery, plugged in again, then run down in the evening"""
+    return synthetic_trace([
+        (2 * 3600, True, 5),
+        (3 * 3600, False, -12),
+        (4 * 3600, True, 30),
+        (DAY - 9 * 3600, False, -8),
+    ])
+
+
+def scenarios():
+    """Yield (config, trace) for every combination of the grid"""
+    for delay, threshold, rate, unplug in itertools.product(DELAYS, THRESHOLDS, DRAIN_RATES, UNPLUG_AFTER):
+        trace = synthetic_trace([(unplug, True, 0), (DAY - unplug, False, rate)] if unplug else
+                                [(DAY, False, rate)])
+        yield {'delay_minutes': delay, 'battery_percent': threshold}, trace
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenarios', type=int, default=None, help='limit the number of grid scenarios')
+    args = parser.parse_args()
+
+    trace = full_day_trace()
+    for notifications in (True, False):
+        result = ReplayHarness(trace, notifications=notifications).run()
+        mode = 'notifications' if notifications else 'polling'
+        print(f"full day ({mode}): {result.wall_seconds * 1000:.1f} ms, {result.evaluations} checks, "
+              f"trigger after {result.triggered_after} s")
+
+    started = time.perf_counter()
+    count = triggered = checks = 0
+    for notifications in (True, False):
+        for config, scenario_trace in itertools.islice(scenarios(), args.scenarios):
+            result = ReplayHarness(scenario_trace, config, notifications).run()
+            count += 1
+            checks += result.evaluations
+            triggered += result.triggered_after is not None
+    elapsed = time.perf_counter() - started
+    print(f"grid: {count} day-long scenarios ({triggered} triggered, {checks} checks) in {elapsed:.2f} s, "
+          f"{elapsed / count * 1000:.2f} ms per scenario")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Translation lookup benchmark
+Compares compiled catalog lookups with the previous per-call dictionary lookup and str.format
+
+Usage: python -m benchmarks.bench_translations [--lang CODE] [--number N]
+"""
+
+import argparse
+import sys
+import timeit
+
+from src.i18n.translations import TRANSLATIONS, Translator
+
+
+def legacy_get(lang, key, **kwargs):
+    """Translator.get as it was before catalogs were compiled"""
+    translation = TRANSLATIONS.get(lang, TRANSLATIONS['en']).get(key, key)
+    if kwargs:
+        return translation.format(**kwargs)
+    return translation
+
+
+def build_status_text(get):
+    """Same strings MainWindow.update_status builds every second while the timer runs"""
+    status_text = f'{get("battery_charge")}: {get("power_battery")}\n'
+    status_text += f'{get("battery_charge")}: 57%\n'
+    status_text += f'{get("estimated_runtime")}: 1 {get("hours_short")} 5 {get("minutes_short")}\n'
+    status_text += f'\n{get("auto_shutdown_enabled")}'
+    status_text += f'\n{get("time_until_shutdown")}: '
+    status_text += f'4 {get("minutes_short")} '
+    status_text += f'12 {get("seconds_short")}'
+    return status_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lang', default='uk')
+    parser.add_argument('--number', type=int, default=200000)
+    args = parser.parse_args()
+
+    # Build-time check: every language must define every key
+    missing = {lang: Translator.missing_keys(lang) for lang in TRANSLATIONS}
+    for lang, keys in missing.items():
+        if keys:
+            print(f"FAIL {lang} is missing keys: {', '.join(keys)}")
+
+    translator = Translator()
+    translator.set_language(args.lang)
+    lang = args.lang
+
+    cases = {
+        'get': (lambda: translator.get('power_battery'),
+                lambda: legacy_get(lang, 'power_battery')),
+        'get with format': (lambda: translator.get('computer_shutdown_in', seconds=12),
+                            lambda: legacy_get(lang, 'computer_shutdown_in', seconds=12)),
+        'status text': (lambda: build_status_text(translator.get),
+                        lambda: build_status_text(lambda key: legacy_get(lang, key))),
+    }
+    for name, (compiled, legacy) in cases.items():
+        compiled_ns = min(timeit.repeat(compiled, number=args.number, repeat=3)) / args.number * 1e9
+        legacy_ns = min(timeit.repeat(legacy, number=args.number, repeat=3)) / args.number * 1e9
+        print(f"{name:>16}: {compiled_ns:8.0f} ns compiled  {legacy_ns:8.0f} ns legacy")
+
+    return 1 if any(missing.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
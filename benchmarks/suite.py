@@ -0,0 +1,289 @@
+"""
+Core benchmark suite
+Times the hot paths headless and writes the results as JSON for comparing versions
+
+Usage: python -m benchmarks.suite [--runs 3] [--output FILE] [--compare BASELINE] [--threshold 0.5]
+
+Compare against the numbers committed in benchmarks/baseline.json or against a file
+written by the same command on an older checkout. Ratios are scaled by a reference
+workload that no change to the app affects, so a machine (or VM) that is slower or
+faster overall doesn't look like a regression.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from contextlib import redirect_stdout
+
+from benchmarks.bench_core_loop import make_fake_battery
+from benchmarks.bench_import_time import ROOT, measure_import
+from src.core.battery import BatterySampler
+from src.core.battery_backends import PsutilBackend, SysfsBackend
+from src.core.config import ConfigManager, ConfigSnapshot
+from src.core.monitor import BatteryMonitor
+from src.core.replay import ReplayBackend, StaticConfig, VirtualClock, synthetic_trace
+from src.core.signals import MonitorSignals
+from src.gui.status import render_status, status_state
+from src.i18n.translations import translator
+
+
+FORMAT_VERSION = 2
+MIN_TIME = 0.2  # seconds per repeat
+REPEAT = 5
+RUNS = 3  # whole suite runs, results are medians over them
+IMPORT_RUNS = 5
+IMPORT_MODULES = ('src.core.daemon', 'src.gui.main_window')
+
+
+class TempConfigManager(ConfigManager):
+    """ConfigManager writing to a scratch directory instead of the user's config"""
+
+    def __init__(self, directory):
+        self._directory = directory
+        super().__init__()
+
+    def _get_config_path(self):
+        """Get path to the configuration file in the scratch directory"""
+        return os.path.join(self._directory, 'config.json')
+
+
+def time_call(func):
+    """Time func() per call, returns {'median', 'min'} in microseconds plus the loop count"""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * MIN_TIME / elapsed)) if elapsed < MIN_TIME else number
+    runs = [total / number * 1e6 for total in timer.repeat(REPEAT, number)]
+    return {'unit': 'us', 'median': statistics.median(runs), 'min': min(runs), 'number': number, 'repeat': REPEAT}
+
+
+def bench_reference():
+    """Fixed pure-Python workload (dict iteration, arithmetic, formatting) measuring the machine itself"""
+    data = {str(i): i for i in range(100)}
+
+    def work():
+        total = 0
+        for key in data:
+            total += data[key]
+        return f"{total:d}"
+
+    return {'reference': time_call(work)}
+
+
+def discharging_monitor():
+    """Monitor on a virtual clock with the shutdown timer running, like the minutes before shutdown"""
+    clock = VirtualClock(0.0)
+    trace = synthetic_trace([(60, True, 0), (6 * 3600, False, -15)])
+    source = BatterySampler(ReplayBackend(trace, clock), max_age=0)
+    config = ConfigSnapshot(ConfigManager.validate({'enabled': True, 'delay_minutes': 60}), 1)
+    monitor = BatteryMonitor(StaticConfig(config), MonitorSignals(), clock=clock, battery_source=source)
+    source.add_listener(monitor.estimator.add_snapshot)
+    with redirect_stdout(io.StringIO()):
+        for now in range(0, 3600, 30):
+            clock.now = float(now)
+            monitor.evaluate()
+    return monitor, clock, source
+
+
+def bench_monitor():
+    """One BatteryMonitor evaluation and the status panel text built from its state"""
+    monitor, clock, source = discharging_monitor()
+    start = clock.now
+
+    def evaluate():
+        # Stay inside the trace, a fresh timestamp keeps the estimator doing real work
+        clock.now = start + (clock.now - start + 0.01) % 3600
+        monitor.evaluate()
+
+    battery = source.read()
+    results = {'monitor_evaluate': time_call(evaluate)}
+    results['status_state_render'] = time_call(lambda: render_status(status_state(battery, True, monitor, clock.now)))
+    return results
+
+
+def bench_translator():
+    """Plain and formatted translation lookups"""
+    return {
+        'translator_get': time_call(lambda: translator.get('battery_charge')),
+        'translator_get_format': time_call(lambda: translator.get('computer_shutdown_in', seconds=12)),
+    }
+
+
+def bench_config():
+    """Loading config.json and an atomic save (including fsync) of one change"""
+    directory = tempfile.mkdtemp(prefix='bench_config_')
+    try:
+        manager = TempConfigManager(directory)
+        manager.set('enabled', True)
+        manager.save()
+        manager.flush()
+        values = iter(range(1, 10 ** 9))
+
+        def save():
+            manager.set('delay_minutes', next(values) % 60 + 1)
+            manager.save()
+            manager.flush()
+
+        return {'config_load': time_call(manager.load), 'config_save': time_call(save)}
+    finally:
+        shutil.rmtree(directory)
+
+
+def bench_backends():
+    """Battery backend reads: sysfs against a fake tree, psutil against the real sensor"""
+    results = {}
+    fake_root = make_fake_battery()
+    try:
+        backend = SysfsBackend(fake_root)
+        results['backend_sysfs_read'] = time_call(backend.read)
+        backend.close()
+    finally:
+        shutil.rmtree(fake_root)
+    try:
+        backend = PsutilBackend()
+        if backend.read() is not None:
+            results['backend_psutil_read'] = time_call(backend.read)
+    except (ImportError, AttributeError):
+        pass
+    return results
+
+
+def bench_imports():
+    """Cold import time of each entry point's startup modules, best of several fresh interpreters"""
+    results = {}
+    for module in IMPORT_MODULES:
+        try:
+            runs = [measure_import(module)[1] / 1000 for _ in range(IMPORT_RUNS)]
+        except RuntimeError:
+            continue
+        name = 'import_' + module.rsplit('.', 1)[-1]
+        results[name] = {'unit': 'ms', 'median': statistics.median(runs), 'min': min(runs),
+                         'number': 1, 'repeat': IMPORT_RUNS}
+    return results
+
+
+def environment():
+    """Describe where the numbers come from"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'format_version': FORMAT_VERSION,
+        'commit': commit,
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def combine_runs(runs):
+    """Merge the results of several suite runs
+
+    'best' is the median of the runs' minimums, the fastest time being the least disturbed
+    by other load and the median over runs the least disturbed by a bad run. 'spread' is
+    the median distance of the minimums from it, relative to it: the typical noise between
+    runs, which unlike the range does not grow with the number of runs.
+    """
+    combined = {}
+    for name in runs[0]:
+        per_run = [run[name] for run in runs if name in run]
+        minimums = [result['min'] for result in per_run]
+        best = statistics.median(minimums)
+        combined[name] = dict(per_run[0], median=statistics.median(result['median'] for result in per_run),
+                              min=min(minimums), best=best, runs=len(per_run),
+                              spread=statistics.median(abs(minimum - best) for minimum in minimums) / best if best else 0.0)
+    return combined
+
+
+def best_time(result):
+    """Time compared between versions ('min' in files from before runs were combined)"""
+    return result.get('best', result['min'])
+
+
+def compare(results, baseline, threshold):
+    """Print ratios against a baseline, returns the names that regressed
+
+    Ratios are also shown divided by the reference workload's ratio, to take out the
+    machine's speed. The reference is noisy itself, so a benchmark only regressed if both
+    ratios exceed threshold plus the run-to-run spread seen in either file (the spread
+    counting at most as much as threshold itself).
+    """
+    old_results = baseline.get('results', {})
+    speed = 1.0
+    if 'reference' in results and 'reference' in old_results:
+        speed = best_time(results['reference']) / best_time(old_results['reference'])
+        print(f"\nReference workload takes {speed:.2f}x the baseline's time here (scaled = raw / {speed:.2f})")
+
+    regressed = []
+    print(f"\n{'benchmark':26} {'baseline':>12} {'current':>12} {'raw':>7} {'scaled':>7} {'noise':>6}")
+    for name, result in results.items():
+        if name == 'reference':
+            continue
+        old = old_results.get(name)
+        current = best_time(result)
+        if old is None:
+            print(f"{name:26} {'-':>12} {current:>10.2f}{result['unit']:>2}")
+            continue
+        raw = current / best_time(old) if best_time(old) else float('inf')
+        scaled = raw / speed
+        noise = max(result.get('spread', 0.0), old.get('spread', 0.0))
+        flag = ''
+        if min(raw, scaled) > 1 + threshold + min(noise, threshold):
+            flag = '  REGRESSION'
+            regressed.append(name)
+        print(f"{name:26} {best_time(old):>10.2f}{old['unit']:>2} {current:>10.2f}{result['unit']:>2} "
+              f"{raw:>6.2f}x {scaled:>6.2f}x {noise:>5.0%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=RUNS, help='times to run the whole suite, medians are reported')
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON file to compare with')
+    parser.add_argument('--threshold', type=float, default=0.5, help='slowdown ratio reported as a regression')
+    args = parser.parse_args()
+
+    runs = []
+    for run in range(args.runs):
+        print(f"Run {run + 1} of {args.runs}", file=sys.stderr)
+        results = {}
+        for group in (bench_reference, bench_monitor, bench_translator, bench_config, bench_backends, bench_imports):
+            results.update(group())
+        runs.append(results)
+    results = combine_runs(runs)
+    for name, result in results.items():
+        print(f"{name:26} {result['median']:>10.2f} {result['unit']:3} (best {result['best']:.2f}, "
+              f"spread {result['spread']:.0%})")
+
+    report = {'environment': environment(), 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressed = compare(results, json.load(f), args.threshold)
+        if regressed:
+            print(f"{len(regressed)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
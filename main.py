@@ -4,16 +4,43 @@ Automatically shuts down the computer when running on battery power
 """
 
 import sys
-from PyQt5.QtWidgets import QApplication
-from src.gui.main_window import MainWindow
 
 
 def main():
     """Main application entry point"""
+    if sys.argv[1:2] == ['ctl']:
+        # Client for a running instance, imports neither Qt nor the monitor
+        from src.core.control_client import main as ctl_main
+        sys.exit(ctl_main(sys.argv[2:]))
+
+    # One monitor per user: a second start hands over to the first one and exits before Qt is loaded
+    from src.core.instance import InstanceLock, forward_activation
+    instance_lock = InstanceLock()
+    if not instance_lock.acquire():
+        pid = instance_lock.holder_pid()
+        if '--headless' not in sys.argv and forward_activation(instance_lock):
+            print(f"Already running (pid {pid}), showing its window.")
+            sys.exit(0)
+        print(f"Already running (pid {pid}).")
+        sys.exit(1 if '--headless' in sys.argv else 0)
+
+    if '--profile' in sys.argv or '--profile-cpu' in sys.argv:
+        # Before anything else so startup is covered too
+        from src.core.metrics import metrics
+        metrics.enable(cpu_profile='--profile-cpu' in sys.argv)
+
+    if '--headless' in sys.argv:
+        # Keep PyQt5 out of the process entirely
+        from src.core.daemon import run_headless
+        sys.exit(run_headless())
+
+    from PyQt5.QtWidgets import QApplication
+    from src.gui.main_window import MainWindow
+
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
     
-    window = MainWindow()
+    window = MainWindow(instance_lock)
     window.show()
     
     sys.exit(app.exec_())
@@ -0,0 +1,116 @@
+"""
+Battery sampling service
+Owns all battery sensor reads and shares a cached snapshot between callers
+"""
+
+import threading
+import time
+
+from src.core.battery_backends import create_backend
+from src.core.metrics import metrics
+
+
+class BatterySampler:
+    """Serves battery snapshots, reading the sensor at most once per freshness window"""
+
+    DEFAULT_MAX_AGE = 2.0  # seconds
+
+    def __init__(self, backend=None, max_age=DEFAULT_MAX_AGE):
+        self.backend = backend  # created on first read if not given
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._read_at = None  # time.monotonic() of the last sensor read
+        self._listeners = []
+
+        # Statistics
+        self.request_count = 0
+        self.read_count = 0
+        self.total_read_time = 0.0
+        self.max_read_time = 0.0
+
+    def read(self, max_age=None):
+        """Return a battery snapshot no older than max_age seconds (None if no battery)"""
+        if max_age is None:
+            max_age = self.max_age
+        self.request_count += 1
+
+        # Fast path: cached snapshot is still fresh, no locking needed
+        read_at = self._read_at
+        if read_at is not None and time.monotonic() - read_at < max_age:
+            return self._snapshot
+
+        with self._lock:
+            # Another caller may have refreshed the snapshot while we were waiting
+            if self._read_at is not None and time.monotonic() - self._read_at < max_age:
+                return self._snapshot
+            return self._refresh()
+
+    def latest(self):
+        """Return the last snapshot read without touching the sensor (None if no battery or no read yet)"""
+        return self._snapshot
+
+    def set_backend(self, backend):
+        """Replace the battery data source"""
+        with self._lock:
+            if self.backend is not None:
+                self.backend.close()
+            self.backend = backend
+            self._read_at = None
+
+    def add_listener(self, callback):
+        """Call callback(snapshot) after every sensor read"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Stop calling callback after sensor reads"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def invalidate(self):
+        """Force the next read to hit the sensor"""
+        self._read_at = None
+
+    def _refresh(self):
+        """Read the sensor and store the result (caller must hold the lock)"""
+        if self.backend is None:
+            self.backend = create_backend()
+
+        started = time.perf_counter()
+        try:
+            snapshot = self.backend.read()
+        except Exception as e:
+            print(f"Error reading battery: {e}")
+            snapshot = None
+        elapsed = time.perf_counter() - started
+
+        self.read_count += 1
+        self.total_read_time += elapsed
+        self.max_read_time = max(self.max_read_time, elapsed)
+        metrics.record('battery.read', elapsed)
+
+        self._snapshot = snapshot
+        self._read_at = time.monotonic()
+
+        for callback in self._listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"Error in battery listener: {e}")
+        return self._snapshot
+
+    def stats(self):
+        """Get sensor read statistics"""
+        return {
+            'backend': self.backend.name if self.backend else None,
+            'requests': self.request_count,
+            'sensor_reads': self.read_count,
+            'cache_hits': self.request_count - self.read_count,
+            'avg_read_ms': (self.total_read_time / self.read_count * 1000) if self.read_count else 0.0,
+            'max_read_ms': self.max_read_time * 1000,
+        }
+
+
+# Global battery sampler instance
+battery_sampler = BatterySampler()
+metrics.add_provider('battery', battery_sampler.stats)
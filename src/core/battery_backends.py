@@ -0,0 +1,206 @@
+"""
+Battery data sources
+Pluggable backends that read the battery sensor for BatterySampler
+"""
+
+import os
+import sys
+import time
+from collections import namedtuple
+
+from src.core.power_events import SYSFS_POWER_SUPPLY
+
+
+# Same leading field names as psutil's sbattery, so callers can use either interchangeably.
+# energy_now is in uWh and power_now in uW, None where the backend can't tell.
+BatterySnapshot = namedtuple(
+    'BatterySnapshot',
+    ['percent', 'secsleft', 'power_plugged', 'timestamp', 'energy_now', 'power_now', 'status'],
+    defaults=(None, None, None)
+)
+
+# Same values as psutil.POWER_TIME_UNKNOWN / psutil.POWER_TIME_UNLIMITED
+POWER_TIME_UNKNOWN = -1
+POWER_TIME_UNLIMITED = -2
+
+
+class BatteryBackend:
+    """Base class for battery data sources"""
+
+    name = None
+
+    def read(self):
+        """Read the sensor, returns BatterySnapshot or None if there is no battery"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release resources held by the backend"""
+
+
+class PsutilBackend(BatteryBackend):
+    """Reads the battery through psutil (all platforms)"""
+
+    name = 'psutil'
+
+    def __init__(self):
+        import psutil
+        self._sensors_battery = psutil.sensors_battery
+
+    def read(self):
+        battery = self._sensors_battery()
+        if battery is None:
+            return None
+        return BatterySnapshot(battery.percent, battery.secsleft, battery.power_plugged, time.time())
+
+
+class SysfsBackend(BatteryBackend):
+    """Reads /sys/class/power_supply directly through descriptors kept open between reads"""
+
+    name = 'sysfs'
+    READ_SIZE = 64
+    PLUGGED_STATUSES = ('Charging', 'Full', 'Not charging')
+
+    def __init__(self, sysfs_root=SYSFS_POWER_SUPPLY):
+        self.sysfs_root = sysfs_root
+        self._battery_fds = {}
+        self._online_fds = []
+        self._discover()
+
+    @staticmethod
+    def is_supported(sysfs_root=SYSFS_POWER_SUPPLY):
+        """Check whether sysfs power supplies exist on this system"""
+        return sys.platform.startswith('linux') and os.path.isdir(sysfs_root)
+
+    def _discover(self):
+        """Find the battery and AC adapters once and open their attributes"""
+        self.close()
+        try:
+            names = sorted(os.listdir(self.sysfs_root))
+        except OSError:
+            return
+
+        for name in names:
+            supply_dir = os.path.join(self.sysfs_root, name)
+            supply_type = self._read_file(os.path.join(supply_dir, 'type'))
+            if supply_type == 'Battery':
+                if self._battery_fds or self._read_file(os.path.join(supply_dir, 'present')) == '0':
+                    continue
+                # Batteries report either energy (uWh/uW) or charge (uAh/uA) attributes
+                for attr in ('capacity', 'status', 'energy_now', 'energy_full', 'power_now',
+                             'charge_now', 'charge_full', 'current_now', 'voltage_now'):
+                    fd = self._open_first(supply_dir, (attr,))
+                    if fd is not None:
+                        self._battery_fds[attr] = fd
+            else:
+                fd = self._open_first(supply_dir, ('online',))
+                if fd is not None:
+                    self._online_fds.append(fd)
+
+    @staticmethod
+    def _read_file(path):
+        """Read a sysfs attribute by path, None if missing"""
+        try:
+            with open(path, 'r') as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _open_first(supply_dir, candidates):
+        """Open the first existing attribute from candidates"""
+        for attr in candidates:
+            try:
+                return os.open(os.path.join(supply_dir, attr), os.O_RDONLY)
+            except OSError:
+                continue
+        return None
+
+    def _pread(self, fd):
+        """Re-read an open attribute from offset 0"""
+        return os.pread(fd, self.READ_SIZE, 0).strip()
+
+    def _pread_int(self, key):
+        fd = self._battery_fds.get(key)
+        if fd is None:
+            return None
+        try:
+            return int(self._pread(fd))
+        except ValueError:
+            return None
+
+    def _pread_energy(self, energy_key, charge_key, voltage):
+        """Energy attribute (uWh, uW), or the charge one (uAh, uA) times the voltage (uV)"""
+        value = self._pread_int(energy_key)
+        if value is not None or voltage is None:
+            return value
+        charge = self._pread_int(charge_key)
+        return abs(charge) * voltage // 1000000 if charge is not None else None
+
+    def read(self):
+        try:
+            return self._read()
+        except OSError:
+            # Supply was removed or replaced, rediscover and retry once
+            self._discover()
+            try:
+                return self._read()
+            except OSError:
+                return None
+
+    def _read(self):
+        if not self._battery_fds:
+            return None
+
+        status_fd = self._battery_fds.get('status')
+        status = self._pread(status_fd).decode() if status_fd is not None else None
+        # Charge-based batteries need the present voltage to report energy and power
+        voltage = None
+        if not {'energy_now', 'power_now'} <= self._battery_fds.keys():
+            voltage = self._pread_int('voltage_now')
+        energy_now = self._pread_energy('energy_now', 'charge_now', voltage)
+        power_now = self._pread_energy('power_now', 'current_now', voltage)
+
+        percent = self._pread_int('capacity')
+        if percent is None:
+            # The ratio is the same in energy and charge units
+            energy_based = 'energy_now' in self._battery_fds
+            now = energy_now if energy_based else self._pread_int('charge_now')
+            full = self._pread_int('energy_full' if energy_based else 'charge_full')
+            if now is None or not full:
+                return None
+            percent = min(100, now * 100 / full)
+
+        if self._online_fds:
+            plugged = any(self._pread(fd) == b'1' for fd in self._online_fds)
+        else:
+            plugged = status in self.PLUGGED_STATUSES
+
+        if plugged:
+            secsleft = POWER_TIME_UNLIMITED
+        elif energy_now is not None and power_now:
+            secsleft = int(energy_now / power_now * 3600)
+        else:
+            secsleft = POWER_TIME_UNKNOWN
+
+        return BatterySnapshot(percent, secsleft, plugged, time.time(), energy_now, power_now, status)
+
+    def close(self):
+        for fd in list(self._battery_fds.values()) + self._online_fds:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._battery_fds = {}
+        self._online_fds = []
+
+
+def create_backend(name='auto'):
+    """Create a battery backend by name ('auto', 'sysfs' or 'psutil')"""
+    if name in ('auto', 'sysfs') and SysfsBackend.is_supported():
+        backend = SysfsBackend()
+        if backend.read() is not None:
+            return backend
+        backend.close()
+        if name == 'sysfs':
+            print("No battery found in sysfs, falling back to psutil")
+    return PsutilBackend()
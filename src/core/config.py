@@ -3,32 +3,99 @@ Configuration management module
 Handles loading and saving application settings
 """
 
+import atexit
 import os
 import json
+import threading
+import time
+import weakref
+from collections.abc import Mapping
 from pathlib import Path
 
+from src.core.metrics import metrics
+
+
+# Managers with possibly unsaved changes, flushed once at exit without keeping them alive
+_managers = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    """Write pending changes of every live ConfigManager"""
+    for manager in list(_managers):
+        manager.flush()
+
+
+class ConfigSnapshot(Mapping):
+    """Immutable, versioned view of the configuration
+
+    A new snapshot is published on every change, so readers on other threads
+    always see a consistent set of values without locking.
+    """
+
+    __slots__ = ('version', '_data')
+
+    def __init__(self, data, version):
+        self._data = dict(data)
+        self.version = version
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"ConfigSnapshot(version={self.version}, {self._data!r})"
+
 
 class ConfigManager:
     """Manages application configuration"""
-    
+
     DEFAULT_CONFIG = {
         'enabled': False,
         'delay_minutes': 5,
         'battery_percent': 50,
         'sound_enabled': True,
+        'battery_backend': 'auto',  # 'auto', 'sysfs' or 'psutil'
+        'shutdown_command': None,  # None means the platform default, else a command line or argv list
+        'pre_shutdown_hooks': [],  # commands or {'command'|'callable', 'timeout', 'name'} run before shutdown
+        'metrics_port': None,  # localhost port of the Prometheus metrics endpoint, None disables it
         'language': None  # None means auto-detect
     }
-    
+
+    SAVE_DELAY = 0.5  # seconds without changes before a burst of them is written, once
+    BATTERY_BACKENDS = ('auto', 'sysfs', 'psutil')
+
     def __init__(self):
         self.config_file = self._get_config_path()
-        self.config = self.load()
-    
+        self._file_stamp_seen = self._file_stamp()
+        self.snapshot = ConfigSnapshot(self.load(), 1)
+        self._update_lock = threading.Lock()
+        self._subscribers = []
+
+        self._dirty = False
+        self._last_change = None
+        self._save_cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._writer = None
+        self._writer_idle = False
+        _managers.add(self)
+
+    @property
+    def config(self):
+        """Current configuration (read-only, use set/update to change it)"""
+        return self.snapshot
+
     def _get_config_path(self):
         """Get path to configuration file in user's home directory"""
         app_data_dir = Path.home() / '.win_power_control'
         app_data_dir.mkdir(exist_ok=True)
         return str(app_data_dir / 'config.json')
-    
+
     def load(self):
         """Load configuration from file"""
         if os.path.exists(self.config_file):
@@ -44,23 +111,170 @@ class ConfigManager:
                 print(f"Error loading config: {e}")
                 return self.DEFAULT_CONFIG.copy()
         return self.DEFAULT_CONFIG.copy()
-    
-    def save(self):
-        """Save configuration to file"""
+
+    @classmethod
+    def validate(cls, data):
+        """Check values loaded from file, returns them merged with defaults or raises ValueError"""
+        if not isinstance(data, dict):
+            raise ValueError("configuration must be a JSON object")
+        validated = dict(cls.DEFAULT_CONFIG)
+        validated.update(data)
+
+        for key in ('enabled', 'sound_enabled'):
+            if not isinstance(validated[key], bool):
+                raise ValueError(f"'{key}' must be true or false")
+        for key, low, high in (('delay_minutes', 1, 60), ('battery_percent', 1, 100)):
+            value = validated[key]
+            if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+                raise ValueError(f"'{key}' must be an integer from {low} to {high}")
+        if validated['battery_backend'] not in cls.BATTERY_BACKENDS:
+            raise ValueError(f"'battery_backend' must be one of {', '.join(cls.BATTERY_BACKENDS)}")
+        command = validated['shutdown_command']
+        if command is not None and not (isinstance(command, str) and command.strip()) and not (
+                isinstance(command, list) and command and all(isinstance(arg, str) for arg in command)):
+            raise ValueError("'shutdown_command' must be a command line, a list of arguments or null")
+        hooks = validated['pre_shutdown_hooks']
+        if not isinstance(hooks, list):
+            raise ValueError("'pre_shutdown_hooks' must be a list")
+        for hook in hooks:
+            if isinstance(hook, dict):
+                timeout = hook.get('timeout')
+                if ('command' in hook) == ('callable' in hook) or (
+                        timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0)):
+                    raise ValueError("each pre-shutdown hook needs either 'command' or 'callable' and a positive 'timeout'")
+            elif not isinstance(hook, (str, list)):
+                raise ValueError("pre-shutdown hooks must be commands or objects")
+        port = validated['metrics_port']
+        if port is not None and (isinstance(port, bool) or not isinstance(port, int) or not 1 <= port <= 65535):
+            raise ValueError("'metrics_port' must be a port number from 1 to 65535 or null")
+        if validated['language'] is not None and not isinstance(validated['language'], str):
+            raise ValueError("'language' must be a language code or null")
+        return validated
+
+    def _file_stamp(self):
+        """Get (mtime, size, inode) of the config file, None if it does not exist"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error saving config: {e}")
-    
+            st = os.stat(self.config_file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def reload(self):
+        """Apply the config file if someone else changed it, returns True if applied
+
+        Only a stat() is done unless the file differs from what was last loaded or written.
+        """
+        # Waiting for an in-flight save keeps our own writes from being mistaken for external ones
+        with self._write_lock:
+            stamp = self._file_stamp()
+            if stamp is None or stamp == self._file_stamp_seen:
+                return False
+            self._file_stamp_seen = stamp
+            try:
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    loaded = self.validate(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"Ignoring changed config file: {e}")
+                return False
+
+        self.update(loaded)
+        return True
+
+    def save(self):
+        """Schedule configuration to be saved to file in the background"""
+        with self._save_cond:
+            self._dirty = True
+            self._last_change = time.monotonic()
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+                self._writer.start()
+            elif self._writer_idle:
+                # Only wake a writer waiting for changes, one settling a burst keeps waiting
+                self._save_cond.notify()
+
+    def flush(self):
+        """Write pending changes to file now, blocking until they are on disk"""
+        self._write_pending()
+
+    def _writer_loop(self):
+        """Background thread that writes coalesced changes"""
+        while True:
+            with self._save_cond:
+                self._writer_idle = True
+                while not self._dirty:
+                    self._save_cond.wait()
+                self._writer_idle = False
+                # Let a burst of changes settle before writing, every change moves the deadline
+                while True:
+                    remaining = self._last_change + self.SAVE_DELAY - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._save_cond.wait(remaining)
+            self._write_pending()
+
+    def _write_pending(self):
+        """Write the current configuration if there are unsaved changes"""
+        with self._write_lock:
+            with self._save_cond:
+                if not self._dirty:
+                    return
+                self._dirty = False
+                data = dict(self.snapshot)
+            started = metrics.start()
+            try:
+                self._write_atomic(data)
+            except Exception as e:
+                print(f"Error saving config: {e}")
+            metrics.observe('config.save', started)
+
+    def _write_atomic(self, data):
+        """Write data via a temporary file so the config file is always complete"""
+        tmp_file = self.config_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.config_file)
+        self._file_stamp_seen = self._file_stamp()
+
+        # Persist the rename itself (not supported on Windows)
+        if hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(os.path.dirname(self.config_file), os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
     def get(self, key, default=None):
         """Get configuration value"""
-        return self.config.get(key, default)
-    
+        return self.snapshot.get(key, default)
+
     def set(self, key, value):
         """Set configuration value"""
-        self.config[key] = value
-    
+        self.update({key: value})
+
     def update(self, updates):
-        """Update multiple configuration values"""
-        self.config.update(updates)
\ No newline at end of file
+        """Update multiple configuration values and publish a new snapshot"""
+        with self._update_lock:
+            current = self.snapshot
+            if all(key in current and current[key] == value for key, value in updates.items()):
+                return
+            data = dict(current)
+            data.update(updates)
+            snapshot = ConfigSnapshot(data, current.version + 1)
+            self.snapshot = snapshot
+
+        for callback in list(self._subscribers):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"Error in config subscriber: {e}")
+
+    def subscribe(self, callback):
+        """Call callback(snapshot) after every configuration change (on the changing thread)"""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Stop notifying callback about changes"""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
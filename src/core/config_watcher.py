@@ -0,0 +1,128 @@
+"""
+Configuration file watcher
+Applies external edits of config.json to the running application
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import time
+
+from src.core.loop import core_loop
+from src.core.metrics import metrics
+
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+INOTIFY_EVENT = struct.Struct('iIII')
+
+
+class ConfigWatcher:
+    """Reloads the config file on the core loop when it changes on disk"""
+
+    STAT_INTERVAL = 5  # seconds, used only when inotify is unavailable
+
+    def __init__(self, config_manager, stat_interval=STAT_INTERVAL):
+        self.config_manager = config_manager
+        self.stat_interval = stat_interval
+        self.running = False
+        self.mode = None
+        self._inotify_fd = None
+        self._name = os.fsencode(os.path.basename(config_manager.config_file))
+        self._poll_task = None
+
+        # Statistics
+        self.reloads = 0
+        self.last_reload_latency = None
+
+    def _open_inotify(self):
+        """Watch the config directory with inotify, returns the fd or None"""
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+            if fd < 0:
+                return None
+            # Watch the directory: atomic saves replace the file and its inode
+            directory = os.path.dirname(self.config_manager.config_file)
+            if libc.inotify_add_watch(fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE) < 0:
+                os.close(fd)
+                return None
+            return fd
+        except (OSError, AttributeError) as e:
+            print(f"Config file notifications unavailable, falling back to polling: {e}")
+            return None
+
+    def start(self):
+        """Start watching, safe from any thread"""
+        self.running = True
+        core_loop.call_soon(self._start)
+
+    def _start(self):
+        """Register the inotify fd with the loop, or start polling (on the core loop)"""
+        if not self.running:
+            return
+        self._inotify_fd = self._open_inotify()
+        self.mode = 'inotify' if self._inotify_fd is not None else 'stat'
+        if self._inotify_fd is not None:
+            asyncio.get_running_loop().add_reader(self._inotify_fd, self._on_inotify)
+        else:
+            self._poll_task = asyncio.ensure_future(self._poll())
+
+    def _on_inotify(self):
+        """Handle inotify events, called by the loop when the fd is readable"""
+        detected_at = time.monotonic()
+        try:
+            data = os.read(self._inotify_fd, 4096)
+        except BlockingIOError:
+            return
+        offset = 0
+        changed = False
+        while offset + INOTIFY_EVENT.size <= len(data):
+            _, _, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            if data[offset:offset + length].rstrip(b'\0') == self._name:
+                changed = True
+            offset += length
+        if changed:
+            self._reload(detected_at)
+
+    async def _poll(self):
+        """Compare the file's stat() at a fixed interval"""
+        while self.running:
+            await asyncio.sleep(self.stat_interval)
+            self._reload(time.monotonic())
+
+    def _reload(self, detected_at):
+        """Apply the file if it differs from what the app last loaded or wrote"""
+        started = metrics.start()
+        reloaded = self.config_manager.reload()
+        metrics.observe('config.reload_check', started)
+        if reloaded:
+            metrics.incr('config.external_reloads')
+            self.reloads += 1
+            self.last_reload_latency = time.monotonic() - detected_at
+            print(f"Config file changed, reloaded in {self.last_reload_latency * 1000:.1f} ms")
+
+    def stop(self):
+        """Stop watching, safe from any thread"""
+        if not self.running:
+            return
+        self.running = False
+        core_loop.call_soon(self._stop)
+
+    def _stop(self):
+        """Unregister from the loop and close the inotify fd (on the core loop)"""
+        if self._inotify_fd is not None:
+            asyncio.get_running_loop().remove_reader(self._inotify_fd)
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+        if self._poll_task:
+            self._poll_task.cancel()
+            self._poll_task = None
@@ -0,0 +1,260 @@
+"""
+Control API server
+Answers line-delimited JSON requests on a Unix socket so scripts can query and steer the app
+"""
+
+import asyncio
+import hmac
+import json
+import os
+import secrets
+import socket
+
+from src.core.config import ConfigManager
+from src.core.control_client import is_supported, socket_path
+from src.core.instance import ACTIVATION_HOST, ACTIVATION_TIMEOUT
+from src.core.loop import core_loop
+
+
+class ControlServer:
+    """Unix socket server on the core loop, see control_client for the commands
+
+    Each request is one JSON object per line with a 'command' key, each response one
+    JSON object per line with 'ok' and either the result or 'error'. Status is served
+    from the monitor's cached state, a request never reads the sensor.
+    """
+
+    MAX_LINE = 65536  # bytes per request
+    IDLE_TIMEOUT = 30  # seconds a connection may stay open without a request
+
+    def __init__(self, monitor, config_manager, on_cancel=None, path=None):
+        """on_cancel: called on the core loop by 'cancel' to dismiss a shutdown warning, returns True if one was shown"""
+        self.monitor = monitor
+        self.config_manager = config_manager
+        self.on_cancel = on_cancel
+        self.path = path or socket_path()
+        self.running = False
+        self._task = None
+        self.handlers = {
+            'status': self._status,
+            'enable': lambda request: self._set_config({'enabled': True}),
+            'disable': lambda request: self._set_config({'enabled': False}),
+            'arm': self._arm,
+            'cancel': self._cancel,
+            'config': self._config,
+        }
+
+        # Statistics
+        self.requests = 0
+
+    def register(self, command, handler):
+        """Answer command with handler(request), which returns a dict of response fields"""
+        self.handlers[command] = handler
+
+    def start(self):
+        """Start listening, safe from any thread (does nothing where Unix sockets are unavailable)"""
+        if not is_supported():
+            return
+        self.running = True
+        core_loop.call_soon(self._start)
+
+    def _start(self):
+        """Start the server task (on the core loop)"""
+        if self.running:
+            self._task = asyncio.ensure_future(self._serve())
+
+    def _in_use(self):
+        """Check whether another process is listening on the socket path"""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(self.path)
+            except OSError:
+                return False
+        return True
+
+    async def _serve(self):
+        """Listen until cancelled"""
+        try:
+            if os.path.exists(self.path):
+                if self._in_use():
+                    print(f"Control socket {self.path} is used by another instance, not listening")
+                    self.running = False
+                    return
+                os.unlink(self.path)  # left over from a crash
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            server = await asyncio.start_unix_server(self._handle, self.path, limit=self.MAX_LINE)
+            os.chmod(self.path, 0o600)
+        except OSError as e:
+            print(f"Error starting control socket {self.path}: {e}")
+            self.running = False
+            return
+        try:
+            await asyncio.Event().wait()
+        finally:
+            server.close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    async def _handle(self, reader, writer):
+        """Answer requests until the client closes the connection"""
+        try:
+            while True:
+                line = await asyncio.wait_for(reader.readline(), self.IDLE_TIMEOUT)
+                if not line:
+                    break
+                writer.write(json.dumps(self.dispatch(line)).encode('utf-8') + b'\n')
+                await asyncio.wait_for(writer.drain(), self.IDLE_TIMEOUT)
+        except (asyncio.TimeoutError, ValueError, ConnectionError):
+            pass  # ValueError: request line over MAX_LINE
+        except asyncio.CancelledError:
+            pass  # loop shutting down, the connection is closed below
+        finally:
+            writer.close()
+
+    def dispatch(self, line):
+        """Response dict for one request line"""
+        self.requests += 1
+        try:
+            request = json.loads(line)
+            handler = self.handlers.get(request.get('command')) if isinstance(request, dict) else None
+            if handler is None:
+                return {'ok': False, 'error': f"unknown command, expected one of {', '.join(sorted(self.handlers))}"}
+            response = {'ok': True}
+            response.update(handler(request))
+            return response
+        except ValueError as e:
+            return {'ok': False, 'error': str(e)}
+        except Exception as e:
+            print(f"Error in control request: {e}")
+            return {'ok': False, 'error': f"internal error: {e}"}
+
+    def _status(self, request):
+        """State of the monitor"""
+        return {'status': self.monitor.status()}
+
+    def _set_config(self, updates):
+        """Validate, apply and save configuration changes, returns the new status"""
+        unknown = sorted(set(updates) - set(ConfigManager.DEFAULT_CONFIG))
+        if unknown:
+            raise ValueError(f"unknown setting(s): {', '.join(unknown)}")
+        merged = dict(self.config_manager.snapshot)
+        merged.update(updates)
+        ConfigManager.validate(merged)
+        self.config_manager.update(updates)
+        self.config_manager.save()
+        return self._status(None)
+
+    def _arm(self, request):
+        """Start the shutdown delay now"""
+        minutes = request.get('minutes')
+        if minutes is not None and (isinstance(minutes, bool) or not isinstance(minutes, int) or not 1 <= minutes <= 60):
+            raise ValueError("'minutes' must be an integer from 1 to 60")
+        if not self.config_manager.get('enabled'):
+            raise ValueError("auto-shutdown is disabled, enable it first")
+        self.monitor.arm(minutes)
+        return self._status(None)
+
+    def _cancel(self, request):
+        """Stop the shutdown delay and dismiss a shutdown warning"""
+        was_armed = self.monitor.disarm()
+        warning_cancelled = bool(self.on_cancel()) if self.on_cancel else False
+        response = {'timer_was_armed': was_armed, 'warning_cancelled': warning_cancelled}
+        response.update(self._status(None))
+        return response
+
+    def _config(self, request):
+        """Current configuration, after applying 'set' if given"""
+        updates = request.get('set')
+        if updates is not None:
+            if not isinstance(updates, dict):
+                raise ValueError("'set' must be an object")
+            self._set_config(updates)
+        return {'config': dict(self.config_manager.snapshot)}
+
+    def stop(self):
+        """Stop listening and remove the socket, safe from any thread"""
+        if not self.running:
+            return
+        self.running = False
+        core_loop.call_soon(self._stop)
+
+    def _stop(self):
+        """Cancel the server task (on the core loop)"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self):
+        """Get request statistics"""
+        return {'path': self.path if self.running else None, 'requests': self.requests}
+
+
+class ActivationListener:
+    """Loopback TCP port on the core loop that brings up the window of this instance
+
+    Used where there is no control socket (Windows). The port and a random token are
+    published in the lock file, a request is the token on one line
+    (see instance.send_activation).
+    """
+
+    HOST = ACTIVATION_HOST
+    TIMEOUT = ACTIVATION_TIMEOUT  # seconds a client gets to send the token
+
+    def __init__(self, on_activate):
+        """on_activate: called on the core loop for every valid request"""
+        self.on_activate = on_activate
+        self.token = secrets.token_hex(16)
+        self.port = None
+        self._sock = None
+        self._task = None
+
+    def start(self, instance_lock):
+        """Bind a free port, publish it in the lock file and serve it on the core loop"""
+        # Bound here so the port is known before the lock file is written
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.bind((self.HOST, 0))
+        self._sock.listen()
+        self.port = self._sock.getsockname()[1]
+        instance_lock.publish(self.port, self.token)
+        core_loop.call_soon(self._start)
+
+    def _start(self):
+        """Start the server task (on the core loop)"""
+        self._task = asyncio.ensure_future(self._serve())
+
+    async def _serve(self):
+        """Listen until cancelled"""
+        server = await asyncio.start_server(self._handle, sock=self._sock)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            server.close()
+
+    async def _handle(self, reader, writer):
+        """Check the token of one request and answer 'ok' or 'error'"""
+        try:
+            line = await asyncio.wait_for(reader.readline(), self.TIMEOUT)
+            if hmac.compare_digest(line.strip(), self.token.encode('ascii')):
+                self.on_activate()
+                writer.write(b'ok\n')
+            else:
+                writer.write(b'error\n')
+            await asyncio.wait_for(writer.drain(), self.TIMEOUT)
+        except (asyncio.TimeoutError, ValueError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            pass  # loop shutting down, the connection is closed below
+        finally:
+            writer.close()
+
+    def stop(self):
+        """Stop listening, safe from any thread"""
+        core_loop.call_soon(self._stop)
+
+    def _stop(self):
+        """Cancel the server task (on the core loop)"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
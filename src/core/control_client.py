@@ -0,0 +1,138 @@
+"""
+Control API client
+Talks to a running instance over its Unix socket, without loading Qt or the battery code
+
+Usage: python main.py ctl COMMAND [ARGS] [--json]
+
+Commands:
+  status                 show the state of the running instance
+  enable, disable        switch auto-shutdown on or off
+  arm [MINUTES]          start the shutdown delay now (default: the configured delay),
+                         on AC power it starts when the computer is unplugged
+  cancel                 stop the shutdown delay and any shutdown warning
+  show                   bring up the window of the running app (not in headless mode)
+  config [KEY=VALUE...]  show the configuration or change values (VALUE is JSON)
+"""
+
+import json
+import os
+import socket
+import sys
+
+
+TIMEOUT = 2  # seconds
+
+
+def socket_path():
+    """Path of the control socket in the application data directory"""
+    return os.path.join(os.path.expanduser('~'), '.win_power_control', 'control.sock')
+
+
+def is_supported():
+    """Check whether Unix domain sockets are available on this platform"""
+    return hasattr(socket, 'AF_UNIX')
+
+
+def send(request, path=None, timeout=TIMEOUT):
+    """Send one request dict, returns the response dict
+
+    Raises OSError if no instance is listening.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path or socket_path())
+        sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        data = b''
+        while not data.endswith(b'\n'):
+            chunk = sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("connection closed before a response was received")
+            data += chunk
+    return json.loads(data)
+
+
+def parse_value(text):
+    """JSON value of a KEY=VALUE argument, plain strings don't need quotes"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def build_request(args):
+    """Turn command line arguments into a request dict, raises ValueError on bad usage"""
+    if not args:
+        raise ValueError("missing command")
+    command, rest = args[0], args[1:]
+    if command in ('status', 'enable', 'disable', 'cancel', 'show') and not rest:
+        return {'command': command}
+    if command == 'arm' and len(rest) <= 1:
+        request = {'command': 'arm'}
+        if rest:
+            request['minutes'] = int(rest[0])
+        return request
+    if command == 'config':
+        updates = {}
+        for arg in rest:
+            key, sep, value = arg.partition('=')
+            if not sep:
+                raise ValueError(f"expected KEY=VALUE, got '{arg}'")
+            updates[key] = parse_value(value)
+        return {'command': 'config', 'set': updates} if updates else {'command': 'config'}
+    raise ValueError(f"unknown command or arguments: {' '.join(args)}")
+
+
+def format_status(status):
+    """Human-readable lines for a status response"""
+    lines = [f"Auto-shutdown: {'enabled' if status['enabled'] else 'disabled'}"]
+    if status['battery_present']:
+        lines.append(f"Power: {'AC' if status['on_ac'] else 'battery'}, {status['percent']:g}%")
+    else:
+        lines.append("Power: no battery detected")
+    remaining = status['seconds_to_shutdown']
+    if remaining is not None:
+        lines.append(f"Shutdown timer: {remaining:.0f} s left")
+    else:
+        lines.append(f"Shutdown timer: {'armed, starts on battery power' if status['timer_armed'] else 'not running'}")
+    lines.append(f"Shutdown warnings: {status['triggers']}, cancelled: {status['cancellations']}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    """CLI entry point, returns the exit code (2: no running instance)"""
+    args = list(sys.argv[1:] if argv is None else argv)
+    as_json = '--json' in args
+    if as_json:
+        args.remove('--json')
+    if not args or args[0] in ('-h', '--help'):
+        print(__doc__.strip())
+        return 0 if args else 1
+    if not is_supported():
+        print("The control socket is not supported on this platform.")
+        return 2
+    try:
+        request = build_request(args)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    try:
+        response = send(request)
+    except (OSError, ValueError) as e:
+        print(f"No running instance at {socket_path()}: {e}")
+        return 2
+
+    if as_json:
+        print(json.dumps(response, indent=2))
+    elif not response.get('ok'):
+        print(f"Error: {response.get('error')}")
+    elif 'status' in response:
+        print(format_status(response['status']))
+    elif 'config' in response:
+        for key, value in response['config'].items():
+            print(f"{key} = {json.dumps(value, ensure_ascii=False)}")
+    return 0 if response.get('ok') else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
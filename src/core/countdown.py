@@ -0,0 +1,49 @@
+"""
+Shutdown countdown
+Last-chance countdown before shutdown, shared by the GUI dialog and headless mode
+"""
+
+import asyncio
+
+
+class ShutdownCountdown:
+    """Countdown on the core loop that can be cancelled from any thread"""
+
+    COUNTDOWN_SECONDS = 30
+
+    def __init__(self, seconds=COUNTDOWN_SECONDS, on_tick=None):
+        self.seconds = seconds
+        self.remaining = seconds
+        self.on_tick = on_tick
+        self.cancelled = False
+        self._async_cancel = None
+        self._loop = None
+
+    async def run_async(self):
+        """Wait as a task on the running asyncio loop until the countdown expires (True) or is cancelled (False)"""
+        loop = asyncio.get_running_loop()
+        self._async_cancel = asyncio.Event()
+        self._loop = loop
+        deadline = loop.time() + self.seconds
+        while self.remaining > 0:
+            # Also covers a cancel() that came before the loop was known
+            if self.cancelled:
+                return False
+            if self.on_tick:
+                self.on_tick(self.remaining)
+            # Wait until the next whole second so ticks do not drift
+            next_tick = deadline - (self.remaining - 1)
+            try:
+                await asyncio.wait_for(self._async_cancel.wait(), max(0, next_tick - loop.time()))
+            except asyncio.TimeoutError:
+                pass
+            if self.cancelled:
+                return False
+            self.remaining -= 1
+        return True
+
+    def cancel(self):
+        """Cancel the countdown, safe from any thread"""
+        self.cancelled = True
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._async_cancel.set)
@@ -0,0 +1,181 @@
+"""
+Headless daemon mode
+Runs the auto-shutdown policy without any GUI (PyQt5 is never imported)
+"""
+
+import asyncio
+import signal
+import sys
+
+from src.core.battery import battery_sampler
+from src.core.battery_backends import create_backend
+from src.core.config import ConfigManager
+from src.core.countdown import ShutdownCountdown
+from src.core.loop import core_loop
+from src.core.metrics import metrics
+from src.core.monitor import BatteryMonitor
+from src.core.shutdown import ShutdownAction
+from src.core.signals import MonitorSignals
+from src.i18n.translations import translator
+from src.utils.system import get_alert_player
+
+
+debug_mode = '--debug' in sys.argv
+
+
+class HeadlessApp:
+    """Console equivalent of MainWindow: monitor, shutdown countdown and cancel"""
+
+    # Seconds at which the countdown is logged, besides the first one
+    ANNOUNCE_AT = (20, 10, 5, 4, 3, 2, 1)
+
+    def __init__(self):
+        self.config_manager = ConfigManager()
+        if self.config_manager.get('language'):
+            translator.set_language(self.config_manager.get('language'))
+
+        battery_sampler.set_backend(create_backend(self.config_manager.get('battery_backend')))
+
+        self.signals = MonitorSignals()
+        self.signals.shutdown_triggered.connect(self.on_shutdown_triggered)
+        self.monitor = BatteryMonitor(self.config_manager, self.signals)
+        from src.core.config_watcher import ConfigWatcher
+        from src.core.control import ControlServer
+        from src.core.exporter import MetricsExporter
+        self.config_watcher = ConfigWatcher(self.config_manager)
+        self.exporter = MetricsExporter.from_config(self.monitor, self.config_manager)
+        self.control_server = ControlServer(self.monitor, self.config_manager, on_cancel=self.on_control_cancel)
+        self.countdown = None
+        self._main_task = None
+        self._shutdown_requested = None  # asyncio.Event, created on the loop
+        # Resolve the sound player and shutdown command now rather than when the countdown starts
+        get_alert_player()
+        self.shutdown_action = ShutdownAction.from_config(self.config_manager)
+        from src.core.hooks import PreShutdownHooks
+        self.hooks = PreShutdownHooks.from_config(self.config_manager)
+        self.config_manager.subscribe(self.on_config_changed)
+
+    def on_config_changed(self, snapshot):
+        """Re-resolve the shutdown command and restart the metrics endpoint if their settings changed"""
+        if not self.shutdown_action.is_current(self.config_manager):
+            self.shutdown_action = ShutdownAction.from_config(self.config_manager)
+        if not self.hooks.is_current(self.config_manager):
+            from src.core.hooks import PreShutdownHooks
+            self.hooks = PreShutdownHooks.from_config(self.config_manager)
+        if not self.exporter.is_current(self.config_manager):
+            self.exporter.stop()
+            from src.core.exporter import MetricsExporter
+            self.exporter = MetricsExporter.from_config(self.monitor, self.config_manager)
+            self.exporter.start()
+
+    def on_shutdown_triggered(self):
+        """Hand the shutdown over to the main task (called from the monitor task)"""
+        core_loop.call_soon(self._shutdown_requested.set)
+
+    def on_interrupt(self, signum, frame):
+        """Ctrl+C cancels a running countdown, otherwise exits"""
+        core_loop.call_soon(self._interrupt)
+
+    def on_control_cancel(self):
+        """Cancel a running countdown for a control request (called on the core loop)"""
+        if not self.countdown:
+            return False
+        self.countdown.cancel()
+        return True
+
+    def _interrupt(self):
+        """Handle Ctrl+C on the core loop"""
+        if self.countdown:
+            self.countdown.cancel()
+        elif self._main_task:
+            self._main_task.cancel()
+
+    def run(self):
+        """Run until interrupted, returns the process exit code"""
+        if not battery_sampler.read():
+            print(translator.get('battery_not_detected_dialog'))
+            if not debug_mode:
+                return 0
+            print("!!! Ignored in debug mode")
+
+        previous_handler = signal.signal(signal.SIGINT, self.on_interrupt)
+        try:
+            return core_loop.run(self.main())
+        finally:
+            signal.signal(signal.SIGINT, previous_handler)
+            self.config_manager.flush()
+            if metrics.enabled:
+                try:
+                    metrics.dump()
+                except OSError as e:
+                    print(f"Error writing statistics: {e}")
+
+    async def main(self):
+        """Main task: monitor and watcher run as tasks next to it on the same loop"""
+        self._main_task = asyncio.current_task()
+        self._shutdown_requested = asyncio.Event()
+        self.monitor.start()
+        self.config_watcher.start()
+        self.exporter.start()
+        self.control_server.start()
+        state = translator.get('auto_shutdown_enabled' if self.config_manager.get('enabled') else 'auto_shutdown_disabled')
+        print(f"Running headless. {state}")
+
+        try:
+            while True:
+                await self._shutdown_requested.wait()
+                self._shutdown_requested.clear()
+                await self.run_countdown()
+        except asyncio.CancelledError:
+            print("Interrupted, exiting.")
+        finally:
+            self.monitor.stop()
+            self.config_watcher.stop()
+            self.exporter.stop()
+            self.control_server.stop()
+        return 0
+
+    async def run_countdown(self):
+        """Console replacement for ShutdownDialog: log the countdown, Ctrl+C cancels"""
+        print(f"{translator.get('warning_attention')} Press Ctrl+C to cancel shutdown.")
+        alert_player = get_alert_player() if self.config_manager.get('sound_enabled') else None
+        if alert_player:
+            alert_player.start_repeating()
+
+        # Hooks run while the countdown is shown and must finish by the time it expires
+        hooks = self.hooks
+        hooks.start(ShutdownCountdown.COUNTDOWN_SECONDS)
+        self.countdown = ShutdownCountdown(on_tick=self.on_countdown_tick)
+        try:
+            expired = await self.countdown.run_async()
+        finally:
+            if alert_player:
+                alert_player.stop()
+            self.countdown = None
+
+        if expired:
+            await hooks.wait_async()
+            # Both block (fsync, up to COMMAND_TIMEOUT per shutdown command), the loop keeps
+            # serving the control socket, the exporter and Ctrl+C meanwhile
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.config_manager.flush)
+            await loop.run_in_executor(None, self.shutdown_action.execute,
+                                       self.monitor.triggered_at, self.monitor.telemetry)
+            return
+
+        hooks.cancel()
+        self.monitor.record_cancellation()
+        # Same policy as the dialog: cancelling disables auto-shutdown
+        self.config_manager.set('enabled', False)
+        self.config_manager.save()
+        print(f"{translator.get('shutdown_cancelled')}. {translator.get('auto_shutdown_disabled_msg')}")
+
+    def on_countdown_tick(self, remaining):
+        """Log the remaining countdown time"""
+        if remaining == ShutdownCountdown.COUNTDOWN_SECONDS or remaining in self.ANNOUNCE_AT:
+            print(translator.get('computer_shutdown_in', seconds=remaining))
+
+
+def run_headless():
+    """Headless entry point, returns the process exit code"""
+    return HeadlessApp().run()
@@ -0,0 +1,118 @@
+"""
+Discharge rate estimator
+Predicts when the battery will cross a charge threshold from recent samples
+"""
+
+import math
+
+
+class DischargeEstimator:
+    """Online, O(1) per sample estimate of the battery discharge rate
+
+    Battery percent is usually reported in whole steps, so the rate is measured
+    between changes of the reading and smoothed with a time-weighted EWMA.
+    """
+
+    DEFAULT_TIME_CONSTANT = 600  # seconds, how quickly old rates are forgotten
+
+    def __init__(self, time_constant=DEFAULT_TIME_CONSTANT):
+        self.time_constant = time_constant
+        self.rate = None  # percent per second, positive while discharging
+        self.last_step_rate = None  # rate of the latest single step, unsmoothed
+        self.last_timestamp = None
+        self.last_percent = None
+        self._anchor_timestamp = None
+        self._anchor_percent = None
+
+    def reset(self):
+        """Forget all samples"""
+        self.rate = None
+        self.last_step_rate = None
+        self.last_timestamp = None
+        self.last_percent = None
+        self._anchor_timestamp = None
+        self._anchor_percent = None
+
+    def add_snapshot(self, snapshot):
+        """Add a BatterySnapshot, suitable as a BatterySampler listener"""
+        if snapshot is not None:
+            self.add_sample(snapshot.timestamp, snapshot.percent, snapshot.power_plugged)
+
+    def add_sample(self, timestamp, percent, plugged):
+        """Add a battery reading"""
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return
+        self.last_timestamp = timestamp
+        self.last_percent = percent
+
+        if plugged:
+            # Charging says nothing about the discharge rate
+            self._anchor_timestamp = None
+            return
+
+        if self._anchor_timestamp is None or percent > self._anchor_percent:
+            self._anchor_timestamp = timestamp
+            self._anchor_percent = percent
+            return
+
+        if percent == self._anchor_percent:
+            return
+
+        elapsed = timestamp - self._anchor_timestamp
+        if elapsed <= 0:
+            return
+        rate = (self._anchor_percent - percent) / elapsed
+        self.last_step_rate = rate
+        if self.rate is None:
+            self.rate = rate
+        else:
+            alpha = 1 - math.exp(-elapsed / self.time_constant)
+            self.rate += alpha * (rate - self.rate)
+        self._anchor_timestamp = timestamp
+        self._anchor_percent = percent
+
+    def current_rate(self, now):
+        """Get discharge rate in percent per second, None if unknown
+
+        If the reading has not moved for longer than the rate implies, the rate
+        is capped by what has actually been observed since the last change.
+        """
+        if self.rate is None or self.rate <= 0 or self._anchor_timestamp is None:
+            return None
+        stalled = now - self._anchor_timestamp
+        if stalled > 0:
+            return min(self.rate, 1 / stalled)
+        return self.rate
+
+    def predict_crossing(self, threshold, now):
+        """Get seconds until percent drops to threshold, None if unknown"""
+        if self.last_percent is None:
+            return None
+        if self.last_percent <= threshold:
+            return 0.0
+        rate = self.current_rate(now)
+        if rate is None:
+            return None
+        return max((self.last_percent - threshold) / rate - (now - self.last_timestamp), 0.0)
+
+    def earliest_crossing(self, threshold, now):
+        """Get seconds until the reading can drop to threshold at the fastest recent rate, None if unknown
+
+        Meant for scheduling checks, so it errs early: the larger of the smoothed rate
+        and the latest step is used, without the stall cap of current_rate(), counted
+        from when the reading last changed.
+        """
+        if self.last_percent is None:
+            return None
+        if self.last_percent <= threshold:
+            return 0.0
+        if self.rate is None or self._anchor_timestamp is None:
+            return None
+        rate = max(self.rate, self.last_step_rate or 0.0)
+        if rate <= 0:
+            return None
+        return max(self._anchor_timestamp + (self._anchor_percent - threshold) / rate - now, 0.0)
+
+    def remaining_runtime(self, now):
+        """Get estimated seconds until the battery is empty, None if unknown"""
+        return self.predict_crossing(0, now)
@@ -0,0 +1,176 @@
+"""
+Prometheus metrics endpoint
+Serves the monitor's cached state on localhost in the text exposition format
+"""
+
+import asyncio
+
+from src.core.loop import core_loop
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# name -> (type, help)
+METRICS = {
+    'battery_shutdown_enabled': ('gauge', 'Whether auto-shutdown is enabled'),
+    'battery_shutdown_battery_present': ('gauge', 'Whether a battery was detected at the last sensor read'),
+    'battery_shutdown_on_ac': ('gauge', 'Whether the computer was on AC power at the last sensor read'),
+    'battery_shutdown_battery_percent': ('gauge', 'Battery charge at the last sensor read'),
+    'battery_shutdown_sample_age_seconds': ('gauge', 'Seconds since the last sensor read'),
+    'battery_shutdown_timer_armed': ('gauge', 'Whether the shutdown timer is running'),
+    'battery_shutdown_seconds_to_shutdown': ('gauge', 'Seconds until the shutdown delay expires, only while the timer runs'),
+    'battery_shutdown_triggers_total': ('counter', 'Shutdown warnings shown'),
+    'battery_shutdown_cancellations_total': ('counter', 'Shutdown warnings cancelled by the user'),
+    'battery_shutdown_monitor_wakeups_total': ('counter', 'Battery monitor checks'),
+    'battery_shutdown_sensor_reads_total': ('counter', 'Battery sensor reads'),
+    'battery_shutdown_scrapes_total': ('counter', 'Requests served by this endpoint'),
+}
+
+
+class MetricsExporter:
+    """HTTP server on the core loop answering GET /metrics from cached state
+
+    A scrape never reads the sensor: it renders what the monitor and the battery
+    sampler last saw, and the rendered text is reused until that state changes
+    or the clock moves on to the next second.
+    """
+
+    HOST = '127.0.0.1'
+    READ_TIMEOUT = 5  # seconds a client gets to send its request
+    MAX_REQUEST = 8192  # bytes of request line and headers
+
+    def __init__(self, monitor, config_manager, port, host=HOST):
+        """port: TCP port, 0 picks a free one (see bound_port), None disables the endpoint"""
+        self.monitor = monitor
+        self.config_manager = config_manager
+        self.port = port
+        self.host = host
+        self.running = False
+        self.bound_port = None
+        self._task = None
+        self._server = None
+        self._cache_key = None
+        self._cache = None
+
+        # Statistics
+        self.scrapes = 0
+        self.renders = 0
+
+    @classmethod
+    def from_config(cls, monitor, config_manager):
+        """Create an exporter for the 'metrics_port' setting"""
+        return cls(monitor, config_manager, config_manager.get('metrics_port'))
+
+    def is_current(self, config_manager):
+        """Check whether the 'metrics_port' setting still matches this exporter"""
+        return config_manager.get('metrics_port') == self.port
+
+    def start(self):
+        """Start serving if a port is configured, safe from any thread"""
+        if self.port is None:
+            return
+        self.running = True
+        core_loop.call_soon(self._start)
+
+    def _start(self):
+        """Start the server task (on the core loop)"""
+        if self.running:
+            self._task = asyncio.ensure_future(self._serve())
+
+    async def _serve(self):
+        """Listen until cancelled"""
+        try:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=self.MAX_REQUEST)
+        except OSError as e:
+            print(f"Error starting metrics endpoint on {self.host}:{self.port}: {e}")
+            self.running = False
+            return
+        self.bound_port = self._server.sockets[0].getsockname()[1]
+        print(f"Metrics endpoint listening on http://{self.host}:{self.bound_port}/metrics")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self._server.close()
+
+    async def _handle(self, reader, writer):
+        """Answer one request and close the connection"""
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.READ_TIMEOUT)
+            parts = request.split(b'\r\n', 1)[0].split()
+            if len(parts) != 3 or parts[0] not in (b'GET', b'HEAD'):
+                status, body = '405 Method Not Allowed', b''
+            elif parts[1].split(b'?', 1)[0] not in (b'/metrics', b'/'):
+                status, body = '404 Not Found', b''
+            else:
+                status, body = '200 OK', self.render()
+            header = (f"HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\n"
+                      f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode('ascii')
+            writer.write(header if parts[:1] == [b'HEAD'] else header + body)
+            await asyncio.wait_for(writer.drain(), self.READ_TIMEOUT)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            pass  # loop shutting down, the connection is closed below
+        finally:
+            writer.close()
+
+    def render(self):
+        """Exposition text for the current state, reused while nothing has changed"""
+        self.scrapes += 1
+        monitor = self.monitor
+        key = (monitor.wakeups, monitor.cancellations, monitor.timer_started, monitor.battery_source.read_count,
+               self.config_manager.snapshot.version, int(monitor.clock.time()))
+        if key != self._cache_key:
+            self._cache = self._render()
+            self._cache_key = key
+            self.renders += 1
+        # The scrape counter is the only line that changes on every request
+        return self._cache + f"battery_shutdown_scrapes_total {self.scrapes}\n".encode('ascii')
+
+    def _render(self):
+        """Build the exposition text, without the scrape counter"""
+        status = self.monitor.status()
+        values = {
+            'battery_shutdown_enabled': int(status['enabled']),
+            'battery_shutdown_battery_present': int(status['battery_present']),
+            'battery_shutdown_timer_armed': int(status['timer_armed']),
+            'battery_shutdown_triggers_total': status['triggers'],
+            'battery_shutdown_cancellations_total': status['cancellations'],
+            'battery_shutdown_monitor_wakeups_total': status['wakeups'],
+            'battery_shutdown_sensor_reads_total': status['sensor_reads'],
+        }
+        if status['battery_present']:
+            values['battery_shutdown_on_ac'] = int(status['on_ac'])
+            values['battery_shutdown_battery_percent'] = status['percent']
+            values['battery_shutdown_sample_age_seconds'] = status['sample_age']
+        if status['seconds_to_shutdown'] is not None:
+            values['battery_shutdown_seconds_to_shutdown'] = status['seconds_to_shutdown']
+
+        lines = []
+        for name, (metric_type, help_text) in METRICS.items():
+            if name == 'battery_shutdown_scrapes_total':
+                lines.append(f"# HELP {name} {help_text}\n# TYPE {name} {metric_type}")
+            elif name in values:
+                lines.append(f"# HELP {name} {help_text}\n# TYPE {name} {metric_type}\n{name} {values[name]}")
+        return ('\n'.join(lines) + '\n').encode('ascii')
+
+    def stop(self):
+        """Stop serving, safe from any thread"""
+        if not self.running:
+            return
+        self.running = False
+        core_loop.call_soon(self._stop)
+
+    def _stop(self):
+        """Cancel the server task (on the core loop)"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self):
+        """Get scrape statistics"""
+        return {
+            'port': self.bound_port,
+            'scrapes': self.scrapes,
+            'renders': self.renders,
+        }
@@ -0,0 +1,212 @@
+"""
+Pre-shutdown hooks
+Runs user commands and Python callables concurrently during the shutdown countdown
+"""
+
+import asyncio
+import concurrent.futures
+import importlib
+import subprocess
+import threading
+import time
+from collections import namedtuple
+
+from src.core.countdown import ShutdownCountdown
+from src.core.loop import core_loop
+from src.core.shutdown import split_command
+
+
+HookResult = namedtuple('HookResult', ['name', 'status', 'duration', 'detail'])
+
+# Callables registered from code, run in addition to the hooks from the config file
+registered_hooks = []
+
+
+def register_hook(func, name=None, timeout=None):
+    """Run func() before every shutdown"""
+    registered_hooks.append(CallableHook(func, name, timeout))
+
+
+class Hook:
+    """One pre-shutdown task with its own timeout"""
+
+    DEFAULT_TIMEOUT = 20  # seconds
+
+    def __init__(self, name, timeout=None):
+        self.name = name
+        self.timeout = self.DEFAULT_TIMEOUT if timeout is None else timeout
+
+    async def run(self, timeout):
+        """Run the task for at most timeout seconds, returns (status, detail)"""
+        raise NotImplementedError
+
+
+class CommandHook(Hook):
+    """Runs an external command (without a shell), killed when it runs out of time"""
+
+    OUTPUT_LIMIT = 200  # characters of output kept for the log (the end, where errors are)
+
+    def __init__(self, command, name=None, timeout=None):
+        self.argv = split_command(command) if isinstance(command, str) else list(command)
+        super().__init__(name or ' '.join(self.argv), timeout)
+
+    async def run(self, timeout):
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *self.argv, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        except OSError as e:
+            return 'error', str(e)
+
+        try:
+            output, _ = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return 'timeout', None
+        except asyncio.CancelledError:
+            # Shutdown was cancelled
+            process.kill()
+            await process.wait()
+            raise
+
+        output = output.decode(errors='replace').strip()[-self.OUTPUT_LIMIT:] or None
+        if process.returncode != 0:
+            return 'failed', f"exit code {process.returncode}" + (f": {output}" if output else "")
+        return 'ok', output
+
+
+class CallableHook(Hook):
+    """Calls a Python function in a worker thread, abandoned (not interrupted) when it runs out of time"""
+
+    def __init__(self, func, name=None, timeout=None):
+        self.func = func
+        super().__init__(name or getattr(func, '__qualname__', repr(func)), timeout)
+
+    @classmethod
+    def from_path(cls, path, name=None, timeout=None):
+        """Create the hook from a 'package.module:function' path"""
+        module_name, _, attr = path.partition(':')
+        func = getattr(importlib.import_module(module_name), attr)
+        return cls(func, name or path, timeout)
+
+    async def run(self, timeout):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def set_outcome(outcome):
+            if not future.done():
+                future.set_result(outcome)
+
+        def target():
+            try:
+                result = self.func()
+                outcome = 'ok', None if result is None else str(result)
+            except Exception as e:
+                outcome = 'error', f"{type(e).__name__}: {e}"
+            loop.call_soon_threadsafe(set_outcome, outcome)
+
+        # A daemon thread rather than the loop's executor, whose threads would keep a hung call from exiting
+        threading.Thread(target=target, name=f"hook {self.name}", daemon=True).start()
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return 'timeout', None
+
+
+class PreShutdownHooks:
+    """Starts all hooks at once on the core loop and waits for them until a global deadline
+
+    Hooks are resolved when the object is created (at startup and when the setting
+    changes), so a broken hook is reported early and never holds up a shutdown.
+    One object is reused for every countdown.
+    """
+
+    def __init__(self, hooks, entries=None):
+        self.configured = list(hooks)
+        self.entries = entries  # the 'pre_shutdown_hooks' setting the hooks came from
+        self.hooks = []
+        self.results = []
+        self.deadline = None
+        self._future = None
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Create hooks from the 'pre_shutdown_hooks' setting, entries that fail to load are skipped"""
+        entries = config_manager.get('pre_shutdown_hooks') or []
+        hooks = []
+        for entry in entries:
+            try:
+                if isinstance(entry, dict):
+                    if 'callable' in entry:
+                        hooks.append(CallableHook.from_path(entry['callable'], entry.get('name'), entry.get('timeout')))
+                    else:
+                        hooks.append(CommandHook(entry['command'], entry.get('name'), entry.get('timeout')))
+                else:
+                    hooks.append(CommandHook(entry))
+            except Exception as e:
+                # Anything a hook module raises on import, not just ImportError
+                print(f"Skipping invalid pre-shutdown hook {entry!r}: {type(e).__name__}: {e}")
+        return cls(hooks, list(entries))
+
+    def is_current(self, config_manager):
+        """Check whether the 'pre_shutdown_hooks' setting still matches these hooks"""
+        return (config_manager.get('pre_shutdown_hooks') or []) == self.entries
+
+    def start(self, deadline=ShutdownCountdown.COUNTDOWN_SECONDS):
+        """Start every hook as a task, all must be done within deadline seconds, safe from any thread"""
+        # Hooks registered from code run in addition to the configured ones
+        self.hooks = self.configured + registered_hooks
+        self.results = [None] * len(self.hooks)
+        self._future = None
+        self.deadline = time.monotonic() + deadline
+        if self.hooks:
+            print(f"Starting {len(self.hooks)} pre-shutdown hook(s), deadline {deadline} s")
+            self._future = core_loop.spawn(self._run_all())
+
+    async def _run_all(self):
+        """Run all hooks concurrently"""
+        await asyncio.gather(*(self._run_hook(index, hook) for index, hook in enumerate(self.hooks)))
+
+    async def _run_hook(self, index, hook):
+        """Run one hook and log its outcome"""
+        started = time.monotonic()
+        timeout = max(0, min(hook.timeout, self.deadline - started))
+        status, detail = 'cancelled', None  # kept if the task is cancelled
+        try:
+            status, detail = await hook.run(timeout)
+        except Exception as e:
+            status, detail = 'error', f"{type(e).__name__}: {e}"
+        finally:
+            duration = time.monotonic() - started
+            self.results[index] = HookResult(hook.name, status, duration, detail)
+            print(f"Pre-shutdown hook '{hook.name}': {status} in {duration:.2f} s"
+                  + (f" ({detail})" if detail else ""))
+
+    def wait(self):
+        """Block until all hooks are done or the deadline passes, returns the list of HookResult"""
+        if self._future is not None:
+            try:
+                self._future.result(max(0, self.deadline - time.monotonic()))
+            except (concurrent.futures.TimeoutError, concurrent.futures.CancelledError):
+                pass
+        return self._collect()
+
+    async def wait_async(self):
+        """Same as wait() from a task on the core loop"""
+        if self._future is not None:
+            await asyncio.wait({asyncio.wrap_future(self._future)}, timeout=max(0, self.deadline - time.monotonic()))
+        return self._collect()
+
+    def _collect(self):
+        """Results in hook order, hooks that did not finish count as timed out"""
+        results = [result or HookResult(hook.name, 'timeout', None, None)
+                   for hook, result in zip(self.hooks, self.results)]
+        if results:
+            ok = sum(1 for result in results if result.status == 'ok')
+            print(f"Pre-shutdown hooks done: {ok}/{len(results)} succeeded")
+        return results
+
+    def cancel(self):
+        """Kill running commands, used when the shutdown is cancelled"""
+        if self._future is not None:
+            self._future.cancel()
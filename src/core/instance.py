@@ -0,0 +1,119 @@
+"""
+Single instance guard
+Lock file that keeps a second copy of the app from running its own monitor
+"""
+
+import os
+import socket
+import sys
+
+
+ACTIVATION_HOST = '127.0.0.1'
+ACTIVATION_TIMEOUT = 2  # seconds a running instance waits for an activation request
+
+
+def lock_path():
+    """Path of the lock file in the application data directory"""
+    return os.path.join(os.path.expanduser('~'), '.win_power_control', 'instance.lock')
+
+
+class InstanceLock:
+    """Exclusive lock held for the life of the process
+
+    The operating system drops the lock when the process exits, even after a crash,
+    so a stale lock file never blocks the next start.
+
+    The file holds the pid and, where activation goes over TCP, a 'port token' line.
+    """
+
+    # Windows locks are mandatory, so the locked byte lies past the contents to keep them readable
+    LOCK_OFFSET = 1 << 30
+
+    def __init__(self, path=None):
+        self.path = path or lock_path()
+        self._file = None
+
+    def acquire(self):
+        """Take the lock, returns False if another instance holds it"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        lock_file = open(self.path, 'a+')
+        try:
+            if sys.platform == 'win32':
+                import msvcrt
+                lock_file.seek(self.LOCK_OFFSET)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        # The pid is only informational, the lock is what counts
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(f"{os.getpid()}\n")
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def publish(self, port, token):
+        """Write the activation port and token after the pid"""
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(f"{os.getpid()}\n{port} {token}\n")
+        self._file.flush()
+
+    def _read_lines(self):
+        """Lines of the lock file, empty if it can't be read"""
+        try:
+            with open(self.path, 'r') as f:
+                return f.read().splitlines()
+        except OSError:
+            return []
+
+    def holder_pid(self):
+        """Pid written by the instance holding the lock, None if unknown"""
+        try:
+            return int(self._read_lines()[0])
+        except (IndexError, ValueError):
+            return None
+
+    def activation_address(self):
+        """(port, token) published by the instance holding the lock, None if there is none"""
+        try:
+            port, token = self._read_lines()[1].split()
+            return int(port), token
+        except (IndexError, ValueError):
+            return None
+
+    def release(self):
+        """Give up the lock"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def send_activation(address, timeout=ACTIVATION_TIMEOUT):
+    """Send the token to the activation port (see control.ActivationListener), returns True if accepted"""
+    port, token = address
+    with socket.create_connection((ACTIVATION_HOST, port), timeout) as sock:
+        sock.sendall(token.encode('ascii') + b'\n')
+        return sock.makefile('rb').readline().strip() == b'ok'
+
+
+def forward_activation(instance_lock=None):
+    """Ask the running instance to show its window, returns True if it did"""
+    from src.core import control_client
+    if control_client.is_supported():
+        try:
+            return bool(control_client.send({'command': 'show'}).get('ok'))
+        except (OSError, ValueError):
+            return False
+    address = (instance_lock or InstanceLock()).activation_address()
+    if address is None:
+        return False
+    try:
+        return send_activation(address)
+    except OSError:
+        return False
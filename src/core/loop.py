@@ -0,0 +1,104 @@
+"""
+Core event loop
+Single asyncio loop running the monitor, file/netlink watchers and shutdown hooks as tasks
+"""
+
+import asyncio
+import threading
+
+from src.core.metrics import metrics
+
+
+class CoreLoop:
+    """Owns the asyncio loop: a background thread next to Qt, or the main thread headless"""
+
+    STOP_TIMEOUT = 2  # seconds to wait for tasks to finish when stopping
+
+    def __init__(self):
+        self.loop = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def start_thread(self):
+        """Run the loop in a background thread (GUI mode, the Qt loop owns the main thread)"""
+        if self.loop is not None:
+            return
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        failure = []
+
+        def run():
+            try:
+                asyncio.set_event_loop(self.loop)
+                metrics.profile_thread()
+                self.loop.call_soon(ready.set)
+                self.loop.run_forever()
+                self._finish()
+            except BaseException as e:
+                failure.append(e)
+                raise
+            finally:
+                # Never leave start_thread waiting, whatever went wrong
+                ready.set()
+                self._stopped.set()
+
+        self._thread = threading.Thread(target=run, name='core-loop', daemon=True)
+        self._thread.start()
+        ready.wait()
+        if failure:
+            raise RuntimeError("core loop thread failed to start") from failure[0]
+
+    def run(self, coro):
+        """Run the loop in the current thread until coro finishes (headless mode), returns its result"""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            return self.loop.run_until_complete(coro)
+        finally:
+            self._finish()
+            self._stopped.set()
+
+    def _finish(self):
+        """Cancel tasks that are still running, let them clean up and close the loop"""
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            self.loop.run_until_complete(asyncio.wait(tasks, timeout=self.STOP_TIMEOUT))
+        self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+        self.loop.close()
+
+    def spawn(self, coro):
+        """Schedule coro as a task from any thread, returns a concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, callback, *args):
+        """Call callback(*args) on the loop thread, safe from any thread"""
+        if self.loop is None or self.loop.is_closed():
+            return
+        try:
+            self.loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            pass  # loop closed in the meantime
+
+    def stop(self):
+        """Stop the background loop thread after its tasks are cancelled"""
+        if self._thread is None:
+            return
+        self.call_soon(self.loop.stop)
+        self._stopped.wait(self.STOP_TIMEOUT * 2)
+        self._thread = None
+
+    def stats(self):
+        """Get task statistics"""
+        running = self.loop is not None and not self.loop.is_closed()
+        return {
+            'mode': 'thread' if self._thread else 'main',
+            'running': running,
+            # Reading the task set from another thread is fine for a statistic
+            'tasks': len(asyncio.all_tasks(self.loop)) if running else 0,
+        }
+
+
+core_loop = CoreLoop()
+metrics.add_provider('core_loop', core_loop.stats)
@@ -0,0 +1,194 @@
+"""
+Hot-path instrumentation
+Counters and latency histograms for the monitor, sensor, status and config paths (--profile)
+"""
+
+import bisect
+import json
+import marshal
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+
+# Histogram bucket upper bounds in seconds: 1 us to 10 s in 1-2-5 steps
+BUCKETS = tuple(base * scale for scale in (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1) for base in (1, 2, 5)) + (10,)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram, O(log buckets) per observation"""
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last bucket: above 10 s
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def observe(self, seconds):
+        """Add one duration"""
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (at most the maximum), in seconds"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(BUCKETS[index], self.max) if index < len(BUCKETS) else self.max
+        return self.max
+
+    def summary(self):
+        """Statistics in milliseconds"""
+        ms = lambda value: None if value is None else value * 1000
+        return {
+            'count': self.count,
+            'total_ms': ms(self.total),
+            'mean_ms': ms(self.total / self.count) if self.count else None,
+            'min_ms': ms(self.min),
+            'p50_ms': ms(self.quantile(0.5)),
+            'p90_ms': ms(self.quantile(0.9)),
+            'p99_ms': ms(self.quantile(0.99)),
+            'max_ms': ms(self.max),
+            'buckets': {f"le_{bound * 1000:g}ms": count for bound, count in zip(BUCKETS, self.counts) if count},
+        }
+
+
+class Metrics:
+    """Registry of named counters and histograms, a no-op until enabled
+
+    Hot paths call start() and observe(), which return at once while disabled:
+
+        started = metrics.start()
+        ...
+        metrics.observe('monitor.evaluate', started)
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.cpu_profile = False
+        self.counters = {}
+        self.histograms = {}
+        self.started_at = time.time()
+        self._providers = {}
+        self._profilers = {}
+        self._lock = threading.Lock()
+
+    def enable(self, cpu_profile=False):
+        """Start collecting, with cpu_profile also run cProfile on the calling thread"""
+        self.enabled = True
+        self.cpu_profile = cpu_profile
+        self.profile_thread()
+
+    def profile_thread(self):
+        """Run cProfile on the calling thread, if CPU profiling was requested"""
+        if not self.cpu_profile:
+            return
+        import cProfile
+        name = threading.current_thread().name
+        if name not in self._profilers:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError as e:
+                # Python 3.12+ allows one active profiler per process (sys.monitoring), it sees every thread
+                print(f"Not profiling thread {name} separately: {e}")
+                return
+            self._profilers[name] = profiler
+
+    def start(self):
+        """Timestamp for observe(), None while disabled"""
+        return time.perf_counter() if self.enabled else None
+
+    def observe(self, name, started):
+        """Record the time since start() under name"""
+        if started is None:
+            return
+        self.record(name, time.perf_counter() - started)
+
+    def record(self, name, seconds):
+        """Record an already measured duration under name"""
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, Histogram())
+        histogram.observe(seconds)
+
+    def incr(self, name, amount=1):
+        """Increase a counter"""
+        if not self.enabled:
+            return
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_provider(self, name, stats):
+        """Include stats() of a component in the dump"""
+        self._providers[name] = stats
+
+    def snapshot(self):
+        """All statistics as a JSON-serializable dict"""
+        uptime = time.time() - self.started_at
+        cpu = time.process_time()
+        data = {
+            'pid': os.getpid(),
+            'uptime_s': uptime,
+            # The app's own energy cost: CPU seconds and how often it wakes up
+            'process': {
+                'cpu_s': cpu,
+                'cpu_percent': cpu / uptime * 100 if uptime > 0 else None,
+                'threads': threading.active_count(),
+            },
+            'counters': dict(self.counters),
+            'histograms': {name: histogram.summary() for name, histogram in sorted(self.histograms.items())},
+        }
+        if sys.platform != 'win32':
+            import resource
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            data['process'].update({
+                'voluntary_context_switches': usage.ru_nvcsw,
+                'involuntary_context_switches': usage.ru_nivcsw,
+                'max_rss_kib': usage.ru_maxrss,
+            })
+        for name, stats in list(self._providers.items()):
+            try:
+                data[name] = stats()
+            except Exception as e:
+                data[name] = {'error': str(e)}
+        return data
+
+    def default_dump_path(self):
+        """metrics-<time>.json in the application data directory"""
+        app_data_dir = Path.home() / '.win_power_control'
+        app_data_dir.mkdir(exist_ok=True)
+        return str(app_data_dir / time.strftime('metrics-%Y%m%d-%H%M%S.json'))
+
+    def dump(self, path=None):
+        """Write snapshot() as JSON (and cProfile stats next to it), returns the path"""
+        path = path or self.default_dump_path()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2, default=str)
+            f.write('\n')
+        for name, profiler in list(self._profilers.items()):
+            # snapshot_stats() rather than dump_stats(): profiling goes on, also on other threads
+            profiler.snapshot_stats()
+            with open(f"{os.path.splitext(path)[0]}-{name}.pstats", 'wb') as f:
+                marshal.dump(profiler.stats, f)
+        print(f"Statistics written to {path}")
+        return path
+
+
+metrics = Metrics()
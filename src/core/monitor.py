@@ -1,61 +1,276 @@
 """
-Battery monitoring thread
+Battery monitor
 Monitors battery status and triggers shutdown when conditions are met
 """
 
-import threading
+import asyncio
 import time
-import psutil
 
+from src.core.battery import battery_sampler
+from src.core.estimator import DischargeEstimator
+from src.core.loop import core_loop
+from src.core.metrics import metrics
+from src.core.power_events import PowerSupplyWatcher
+from src.core.telemetry import TelemetryRing
 
-class BatteryMonitor(threading.Thread):
-    """Background thread that monitors battery status"""
-    
-    def __init__(self, config, signals):
-        super().__init__()
-        self.config = config
+
+class BatteryMonitor:
+    """Battery status monitoring task on the core loop"""
+
+    POLL_INTERVAL = 2  # seconds, needed to notice unplugging when there are no notifications
+    HEARTBEAT_INTERVAL = 60  # seconds, when nothing can change without a notification
+    BATTERY_INTERVAL = 15  # seconds, re-check of plug state on battery without notifications
+    # Fastest plausible discharge, used while there is no discharge rate estimate yet
+    MIN_SECONDS_PER_PERCENT = 6
+    MAX_PREDICTION_SLEEP = 300  # seconds, predictions are re-checked at least this often
+    NEAR_THRESHOLD_STEPS = 2  # percent above the threshold at which predictions give way to polling
+
+    def __init__(self, config_manager, signals, clock=time, battery_source=None):
+        """clock: object with time(), battery_source: object with read(), e.g. for replaying traces"""
+        self.config_manager = config_manager
+        self.config = config_manager.snapshot  # snapshot used by the current evaluation
         self.signals = signals
+        self.clock = clock
+        self.battery_source = battery_sampler if battery_source is None else battery_source
         self.running = True
-        self.daemon = True
         self.was_on_ac = True
         self.timer_started = False
         self.shutdown_time = None
+        self.armed_delay = None  # minutes of a delay armed on AC power, started when unplugged
+        self.triggered_at = None  # clock time of the last shutdown trigger
+        self.power_watcher = None
+        self.estimator = DischargeEstimator()
+        self.telemetry = None
+        self.schedule = None  # (wake_at, reason) computed after each check
+        self._wake_event = None  # asyncio.Event, created on the loop
+        self._task = None
+        self._woken_at = None
+
+        # Statistics
+        self.wakeups = 0
+        self.triggers = 0
+        self.cancellations = 0
+        self.started_at = None
+
+    def start(self):
+        """Start monitoring as a task on the core loop"""
+        self._task = core_loop.spawn(self.run())
 
-    def run(self):
+    def is_alive(self):
+        """Check whether the monitoring task is running"""
+        return self._task is not None and not self._task.done()
+
+    async def run(self):
         """Main monitoring loop"""
+        self._wake_event = asyncio.Event()
+        self.started_at = time.monotonic()
+        self.config_manager.subscribe(self.on_config_changed)
+        self.battery_source.add_listener(self.estimator.add_snapshot)
+        metrics.add_provider('monitor', self.stats)
+        try:
+            self.telemetry = TelemetryRing.open_default()
+            self.battery_source.add_listener(self.telemetry.add_snapshot)
+        except (OSError, ValueError) as e:
+            print(f"Error opening telemetry history: {e}")
+        if PowerSupplyWatcher.is_supported():
+            self.power_watcher = PowerSupplyWatcher(self.on_power_changed)
+            self.power_watcher.start()
+
+        try:
+            await self._loop()
+        finally:
+            self.config_manager.unsubscribe(self.on_config_changed)
+            self.battery_source.remove_listener(self.estimator.add_snapshot)
+            if self.telemetry:
+                self.battery_source.remove_listener(self.telemetry.add_snapshot)
+                self.telemetry.flush()
+            if self.power_watcher:
+                self.power_watcher.stop()
+
+    async def _loop(self):
+        """Evaluate, then sleep until the schedule or a wake() says otherwise"""
         while self.running:
-            if self.config['enabled']:
-                battery = psutil.sensors_battery()
-                
-                if battery:
-                    on_ac = battery.power_plugged
-                    percent = battery.percent
-                    
-                    # Transition from AC to battery
-                    if self.was_on_ac and not on_ac:
-                        if not self.timer_started:
-                            self.timer_started = True
-                            self.shutdown_time = time.time() + (self.config['delay_minutes'] * 60)
-                            print(f"Transitioned to battery. Timer started for {self.config['delay_minutes']} minutes.")
-                    
-                    # Returned to AC - cancel timer
-                    if not self.was_on_ac and on_ac:
-                        if self.timer_started:
-                            self.timer_started = False
-                            self.shutdown_time = None
-                            print("Connected to AC power. Timer cancelled.")
-                    
-                    # Check shutdown conditions
-                    if self.timer_started and not on_ac:
-                        if time.time() >= self.shutdown_time and percent <= self.config['battery_percent']:
-                            print(f"Shutdown triggered! Battery: {percent}%")
-                            self.signals.shutdown_triggered.emit()
-                            self.timer_started = False
-                    
-                    self.was_on_ac = on_ac
-                    
-            time.sleep(2)
-    
+            if self._woken_at is not None:
+                latency = time.monotonic() - self._woken_at
+                self._woken_at = None
+                metrics.incr('monitor.power_change_wakeups')
+                print(f"Power source change detected, evaluated in {latency * 1000:.1f} ms")
+
+            wake_at, _ = self.evaluate()
+            try:
+                await asyncio.wait_for(self._wake_event.wait(), max(0, wake_at - self.clock.time()))
+            except asyncio.TimeoutError:
+                pass
+            self._wake_event.clear()
+
+    def evaluate(self):
+        """One loop iteration: check with the latest settings, returns the (wake_at, reason) schedule"""
+        started = metrics.start()
+        self.wakeups += 1
+        # Pick up the latest settings atomically, they stay fixed for this evaluation
+        self.config = self.config_manager.snapshot
+        battery = self.check()
+        self.schedule = self.compute_schedule(self.clock.time(), battery)
+        metrics.observe('monitor.evaluate', started)
+        return self.schedule
+
+    def stats(self):
+        """Get wakeup statistics"""
+        uptime = time.monotonic() - self.started_at if self.started_at is not None else None
+        return {
+            'wakeups': self.wakeups,
+            'wakeups_per_hour': self.wakeups * 3600 / uptime if uptime else None,
+            'next_wake_reason': self.schedule[1] if self.schedule else None,
+            'power_watcher': self.power_watcher.stats() if self.power_watcher else None,
+        }
+
+    def status(self):
+        """Current state from cached values, never reads the sensor"""
+        now = self.clock.time()
+        battery = self.battery_source.latest()
+        remaining = None
+        if self.timer_started and self.shutdown_time is not None:
+            remaining = max(self.shutdown_time - now, 0.0)
+        return {
+            'enabled': bool(self.config_manager.get('enabled')),
+            'battery_present': battery is not None,
+            'on_ac': bool(battery.power_plugged) if battery else None,
+            'percent': battery.percent if battery else None,
+            'sample_age': max(now - battery.timestamp, 0.0) if battery else None,
+            'timer_armed': self.timer_started,
+            'seconds_to_shutdown': remaining,
+            'triggers': self.triggers,
+            'cancellations': self.cancellations,
+            'wakeups': self.wakeups,
+            'sensor_reads': self.battery_source.read_count,
+        }
+
+    def arm(self, delay_minutes=None):
+        """Start the shutdown delay now (default: the configured delay), on AC power it starts when unplugged"""
+        delay = self.config_manager.get('delay_minutes') if delay_minutes is None else delay_minutes
+        self.timer_started = True
+        if self.was_on_ac:
+            # A deadline set now could pass while plugged in and fire the moment the computer is unplugged
+            self.armed_delay = delay
+            self.shutdown_time = None
+            print(f"Shutdown timer armed for {delay} minutes on request, it starts on battery power.")
+        else:
+            self.shutdown_time = self.clock.time() + delay * 60
+            print(f"Shutdown timer started for {delay} minutes on request.")
+        self.wake()
+
+    def disarm(self):
+        """Stop the shutdown delay, returns True if it was running"""
+        was_armed = self.timer_started
+        self.timer_started = False
+        self.shutdown_time = None
+        self.armed_delay = None
+        if was_armed:
+            print("Shutdown timer cancelled on request.")
+            self.wake()
+        return was_armed
+
+    def check(self):
+        """Evaluate shutdown conditions once, returns the battery snapshot used"""
+        if not self.config['enabled']:
+            return None
+
+        battery = self.battery_source.read()
+        if battery:
+            on_ac = battery.power_plugged
+            percent = battery.percent
+
+            # Transition from AC to battery
+            if self.was_on_ac and not on_ac:
+                if not self.timer_started or self.armed_delay is not None:
+                    delay = self.config['delay_minutes'] if self.armed_delay is None else self.armed_delay
+                    self.armed_delay = None
+                    self.timer_started = True
+                    self.shutdown_time = self.clock.time() + (delay * 60)
+                    print(f"Transitioned to battery. Timer started for {delay} minutes.")
+
+            # Returned to AC - cancel timer
+            if not self.was_on_ac and on_ac:
+                if self.timer_started:
+                    self.timer_started = False
+                    self.shutdown_time = None
+                    print("Connected to AC power. Timer cancelled.")
+
+            # Check shutdown conditions
+            if self.timer_started and not on_ac:
+                now = self.clock.time()
+                if now >= self.shutdown_time and percent <= self.config['battery_percent']:
+                    print(f"Shutdown triggered! Battery: {percent}%")
+                    self.triggered_at = now
+                    self.triggers += 1
+                    self.signals.shutdown_triggered.emit()
+                    self.timer_started = False
+
+            self.was_on_ac = on_ac
+
+        return battery
+
+    def compute_schedule(self, now, battery):
+        """Get (wake_at, reason) for the next check that can change the outcome"""
+        watching = self.power_watcher is not None and self.power_watcher.is_alive()
+
+        if not self.config['enabled'] or not battery:
+            # Config changes wake the loop explicitly
+            return now + self.HEARTBEAT_INTERVAL, 'idle'
+
+        if battery.power_plugged or not self.timer_started:
+            if watching:
+                return now + self.HEARTBEAT_INTERVAL, 'heartbeat'
+            return now + self.POLL_INTERVAL, 'poll'
+
+        # Timer is running: nothing can trigger before the deadline or the threshold crossing
+        threshold = self.config['battery_percent']
+        # Steps of the reading come irregularly, so polling starts one step early
+        poll_from = threshold + self.NEAR_THRESHOLD_STEPS
+        crossing = self.estimator.earliest_crossing(poll_from, now)
+        if battery.percent <= poll_from:
+            crossing_at, reason = now + self.POLL_INTERVAL, 'near'
+        elif crossing is not None:
+            crossing_at = now + min(max(crossing, self.POLL_INTERVAL), self.MAX_PREDICTION_SLEEP)
+            reason = 'predicted'
+        else:
+            above = max(battery.percent - threshold, 0)
+            delay = min(max(above * self.MIN_SECONDS_PER_PERCENT, self.POLL_INTERVAL), self.HEARTBEAT_INTERVAL)
+            crossing_at, reason = now + delay, 'percent'
+
+        if now < self.shutdown_time and (battery.percent <= threshold or crossing_at <= self.shutdown_time):
+            wake_at, reason = self.shutdown_time, 'deadline'
+        else:
+            wake_at = crossing_at
+
+        if not watching and wake_at - now > self.BATTERY_INTERVAL:
+            return now + self.BATTERY_INTERVAL, 'poll'
+        return wake_at, reason
+
+    def on_power_changed(self):
+        """Handle power source change notification (called on the core loop)"""
+        self.battery_source.invalidate()
+        self._woken_at = time.monotonic()
+        self.wake()
+
+    def record_cancellation(self):
+        """Count a shutdown warning cancelled by the user"""
+        self.cancellations += 1
+
+    def on_config_changed(self, snapshot):
+        """Re-evaluate immediately with the new settings"""
+        self.wake()
+
+    def wake(self):
+        """Wake the monitoring loop immediately, safe from any thread"""
+        core_loop.call_soon(self._wake)
+
+    def _wake(self):
+        """Set the wake event (on the core loop)"""
+        if self._wake_event is not None:
+            self._wake_event.set()
+
     def stop(self):
-        """Stop the monitoring thread"""
-        self.running = False
\ No newline at end of file
+        """Stop the monitoring task"""
+        self.running = False
+        self.wake()
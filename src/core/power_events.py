@@ -0,0 +1,168 @@
+"""
+Power source change detection
+Wakes listeners when the kernel reports a power_supply state change (Linux)
+"""
+
+import asyncio
+import os
+import socket
+import sys
+import time
+
+from src.core.loop import core_loop
+
+
+SYSFS_POWER_SUPPLY = '/sys/class/power_supply'
+NETLINK_KOBJECT_UEVENT = 15
+
+
+def read_power_state(sysfs_root=SYSFS_POWER_SUPPLY):
+    """Read AC/battery state of every power supply as a comparable tuple"""
+    state = []
+    try:
+        names = sorted(os.listdir(sysfs_root))
+    except OSError:
+        return ()
+
+    for name in names:
+        supply_dir = os.path.join(sysfs_root, name)
+        supply_type = _read_attr(supply_dir, 'type')
+        if supply_type == 'Battery':
+            state.append((name, _read_attr(supply_dir, 'status')))
+        else:
+            state.append((name, _read_attr(supply_dir, 'online')))
+    return tuple(state)
+
+
+def _read_attr(supply_dir, attr):
+    """Read a single sysfs attribute, None if missing"""
+    try:
+        with open(os.path.join(supply_dir, attr), 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+class PowerSupplyWatcher:
+    """Waits on the core loop for power_supply change notifications"""
+
+    POLL_INTERVAL = 2.0  # seconds, used only when notifications are unavailable
+
+    def __init__(self, callback, sysfs_root=SYSFS_POWER_SUPPLY, use_netlink=None, poll_interval=POLL_INTERVAL):
+        self.callback = callback
+        self.sysfs_root = sysfs_root
+        self.poll_interval = poll_interval
+        self.running = False
+        # Kernel notifications only describe the real sysfs tree
+        self.use_netlink = (sysfs_root == SYSFS_POWER_SUPPLY) if use_netlink is None else use_netlink
+        self.mode = None
+        self.state = read_power_state(sysfs_root)
+        self._sock = None
+        self._poll_task = None
+
+        # Statistics
+        self.wakeups = 0
+        self.changes = 0
+        self.last_latency = None
+        self.max_latency = 0.0
+
+    @staticmethod
+    def is_supported(sysfs_root=SYSFS_POWER_SUPPLY):
+        """Check whether power_supply devices can be watched on this system"""
+        return sys.platform.startswith('linux') and os.path.isdir(sysfs_root)
+
+    def _open_netlink(self):
+        """Subscribe to kernel uevents, None if not permitted"""
+        if not self.use_netlink or not hasattr(socket, 'AF_NETLINK'):
+            return None
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+            sock.bind((0, 1))  # multicast group 1: kernel uevents
+            sock.setblocking(False)
+            return sock
+        except OSError as e:
+            print(f"Power supply notifications unavailable, falling back to polling: {e}")
+            return None
+
+    def start(self):
+        """Start watching, safe from any thread"""
+        self.running = True
+        core_loop.call_soon(self._start)
+
+    def is_alive(self):
+        """Check whether the watcher is running"""
+        return self.running
+
+    def _start(self):
+        """Register the netlink socket with the loop, or start polling (on the core loop)"""
+        if not self.running:
+            return
+        self._sock = self._open_netlink()
+        self.mode = 'netlink' if self._sock else 'polling'
+        if self._sock:
+            asyncio.get_running_loop().add_reader(self._sock.fileno(), self._on_netlink)
+        else:
+            self._poll_task = asyncio.ensure_future(self._poll())
+
+    def _on_netlink(self):
+        """Handle a kernel uevent, called by the loop when the socket is readable"""
+        received_at = time.monotonic()
+        self.wakeups += 1
+        try:
+            message = self._sock.recv(8192)
+        except OSError:
+            return
+        if b'\0SUBSYSTEM=power_supply\0' not in message + b'\0':
+            return
+        self._check_state(received_at)
+
+    async def _poll(self):
+        """Re-read sysfs state at a fixed interval"""
+        last_poll = time.monotonic()
+        while self.running:
+            await asyncio.sleep(self.poll_interval)
+            self.wakeups += 1
+            # A change could have happened at any point since the previous poll
+            self._check_state(last_poll)
+            last_poll = time.monotonic()
+
+    def _check_state(self, since):
+        """Notify the callback if AC/battery state differs from the last known one"""
+        state = read_power_state(self.sysfs_root)
+        if state == self.state:
+            return
+        self.state = state
+        self.changes += 1
+        self.last_latency = time.monotonic() - since
+        self.max_latency = max(self.max_latency, self.last_latency)
+        try:
+            self.callback()
+        except Exception as e:
+            print(f"Error in power change callback: {e}")
+
+    def stats(self):
+        """Get detection statistics"""
+        return {
+            'mode': self.mode,
+            'wakeups': self.wakeups,
+            'changes': self.changes,
+            'last_latency_ms': self.last_latency * 1000 if self.last_latency is not None else None,
+            'max_latency_ms': self.max_latency * 1000,
+        }
+
+    def stop(self):
+        """Stop watching, safe from any thread"""
+        if not self.running:
+            return
+        self.running = False
+        core_loop.call_soon(self._stop)
+
+    def _stop(self):
+        """Unregister from the loop and close the socket (on the core loop)"""
+        if self._sock:
+            asyncio.get_running_loop().remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._sock = None
+        if self._poll_task:
+            self._poll_task.cancel()
+            self._poll_task = None
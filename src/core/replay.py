@@ -0,0 +1,258 @@
+"""
+Battery trace replay
+Runs BatteryMonitor against recorded or synthetic traces on a virtual clock
+
+Usage: python -m src.core.replay TRACE [--delay MINUTES] [--percent PERCENT] [--expect SECONDS]
+
+TRACE is a CSV file with a 'timestamp,percent,plugged[,power]' header or a telemetry
+history file (telemetry.bin). With --expect the exit code is 1 unless shutdown is
+triggered that many seconds after the start of the trace ('none' for no trigger).
+"""
+
+import argparse
+import bisect
+import csv
+import io
+import sys
+import time
+from collections import namedtuple
+from contextlib import redirect_stdout
+
+from src.core.battery import BatterySampler
+from src.core.battery_backends import (BatteryBackend, BatterySnapshot,
+                                       POWER_TIME_UNKNOWN, POWER_TIME_UNLIMITED)
+from src.core.config import ConfigManager, ConfigSnapshot
+from src.core.monitor import BatteryMonitor
+from src.core.signals import MonitorSignals
+from src.core.telemetry import FLAG_PLUGGED, FLAG_SHUTDOWN, MAGIC, TelemetryRing
+
+
+TraceSample = namedtuple('TraceSample', ['timestamp', 'percent', 'plugged', 'power'], defaults=(None,))
+
+
+def load_csv(path):
+    """Read a trace from CSV with timestamp, percent, plugged and optional power columns"""
+    trace = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            power = row.get('power')
+            trace.append(TraceSample(float(row['timestamp']), float(row['percent']),
+                                     row['plugged'].strip().lower() in ('1', 'true', 'yes'),
+                                     float(power) if power not in (None, '', 'nan') else None))
+    return sorted(trace, key=lambda sample: sample.timestamp)
+
+
+def load_telemetry(path):
+    """Read a trace from a telemetry history file"""
+    ring = TelemetryRing(path, readonly=True)
+    try:
+        return [TraceSample(timestamp, percent, bool(flags & FLAG_PLUGGED), None if power != power else power)
+                for timestamp, percent, power, flags, _ in ring.iter_records()
+                if not flags & FLAG_SHUTDOWN]
+    finally:
+        ring.close()
+
+
+def load_trace(path):
+    """Read a CSV or telemetry trace, recognised by the file's magic bytes"""
+    with open(path, 'rb') as f:
+        is_telemetry = f.read(len(MAGIC)) == MAGIC
+    return load_telemetry(path) if is_telemetry else load_csv(path)
+
+
+def synthetic_trace(segments, start_percent=100.0, start=0.0, step=30.0):
+    """Build a trace from (duration_seconds, plugged, percent_per_hour) segments
+
+    percent_per_hour is negative while discharging. Samples are step seconds apart
+    and percent is reported in whole steps like real batteries do.
+    """
+    trace = []
+    timestamp, percent = start, float(start_percent)
+    for duration, plugged, rate in segments:
+        end = timestamp + duration
+        while timestamp < end:
+            trace.append(TraceSample(timestamp, float(int(percent)), plugged))
+            advance = min(step, end - timestamp)
+            percent = min(max(percent + rate * advance / 3600, 0.0), 100.0)
+            timestamp += advance
+    trace.append(TraceSample(timestamp, float(int(percent)), segments[-1][1] if segments else True))
+    return trace
+
+
+class VirtualClock:
+    """Clock that only moves when told to, in place of the time module"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def time(self):
+        """Current virtual time"""
+        return self.now
+
+    def monotonic(self):
+        """Current virtual time"""
+        return self.now
+
+
+class ReplayBackend(BatteryBackend):
+    """Battery backend that reports the trace sample current at the virtual time"""
+
+    name = 'replay'
+
+    def __init__(self, trace, clock):
+        self.trace = trace
+        self.clock = clock
+        self._timestamps = [sample.timestamp for sample in trace]
+        self.reads = 0
+
+    def read(self):
+        """Snapshot of the last sample at or before the virtual time"""
+        self.reads += 1
+        now = self.clock.time()
+        index = bisect.bisect_right(self._timestamps, now) - 1
+        if index < 0:
+            return None
+        sample = self.trace[index]
+        return BatterySnapshot(
+            percent=sample.percent,
+            secsleft=POWER_TIME_UNLIMITED if sample.plugged else POWER_TIME_UNKNOWN,
+            power_plugged=sample.plugged,
+            timestamp=now,
+            power_now=sample.power,
+        )
+
+
+class StaticConfig:
+    """Fixed configuration in place of ConfigManager"""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def get(self, key, default=None):
+        """Get configuration value"""
+        return self.snapshot.get(key, default)
+
+
+class _TraceWatcher:
+    """Stands in for PowerSupplyWatcher: the harness wakes the monitor at plug changes"""
+
+    def is_alive(self):
+        """Notifications are always available in a replay"""
+        return True
+
+
+class ReplayResult:
+    """Outcome of one replay"""
+
+    def __init__(self, start, triggers, evaluations, reads, virtual_seconds, wall_seconds, log):
+        self.start = start
+        self.triggers = triggers  # virtual times at which shutdown_triggered fired
+        self.evaluations = evaluations
+        self.reads = reads
+        self.virtual_seconds = virtual_seconds
+        self.wall_seconds = wall_seconds
+        self.log = log
+
+    @property
+    def triggered_after(self):
+        """Seconds from the start of the trace to the first trigger, None if it never fired"""
+        return self.triggers[0] - self.start if self.triggers else None
+
+    def expect_trigger(self, after, tolerance=0.0):
+        """Raise AssertionError unless the first trigger was after seconds from the start (None: no trigger)"""
+        actual = self.triggered_after
+        if after is None and actual is None:
+            return
+        if after is not None and actual is not None and abs(actual - after) <= tolerance:
+            return
+        raise AssertionError(f"expected shutdown trigger after {after} s, got {actual}\n{self.log[-2000:]}")
+
+
+class ReplayHarness:
+    """Drives BatteryMonitor through a trace, jumping the virtual clock between checks"""
+
+    def __init__(self, trace, config=None, notifications=True):
+        """config: settings overriding the defaults (enabled by default),
+        notifications: whether plug changes wake the monitor like PowerSupplyWatcher does
+        """
+        if not trace:
+            raise ValueError("empty trace")
+        self.trace = sorted(trace, key=lambda sample: sample.timestamp)
+        settings = {'enabled': True}
+        settings.update(config or {})
+        self.config = ConfigSnapshot(ConfigManager.validate(settings), 1)
+        self.notifications = notifications
+        # Times at which the power source changes
+        self.changes = [current.timestamp for previous, current in zip(self.trace, self.trace[1:])
+                        if current.plugged != previous.plugged]
+
+    def run(self, until=None, stop_on_trigger=True):
+        """Replay the trace (up to until, virtual time), returns a ReplayResult"""
+        started = time.perf_counter()
+        start = self.trace[0].timestamp
+        end = self.trace[-1].timestamp if until is None else until
+        clock = VirtualClock(start)
+        backend = ReplayBackend(self.trace, clock)
+        # No caching: every read must see the trace at the current virtual time
+        source = BatterySampler(backend, max_age=0)
+        signals = MonitorSignals()
+        monitor = BatteryMonitor(StaticConfig(self.config), signals, clock=clock, battery_source=source)
+        source.add_listener(monitor.estimator.add_snapshot)
+        if self.notifications:
+            monitor.power_watcher = _TraceWatcher()
+        triggers = []
+        signals.shutdown_triggered.connect(lambda: triggers.append(clock.now))
+
+        log = io.StringIO()
+        with redirect_stdout(log):
+            while clock.now <= end:
+                wake_at, _ = monitor.evaluate()
+                if triggers and stop_on_trigger:
+                    break
+                if self.notifications:
+                    index = bisect.bisect_right(self.changes, clock.now)
+                    if index < len(self.changes):
+                        wake_at = min(wake_at, self.changes[index])
+                # Always move forward, even if a schedule is in the past
+                clock.now = max(wake_at, clock.now + 1e-3)
+
+        return ReplayResult(start, triggers, monitor.wakeups, backend.reads,
+                            min(clock.now, end) - start, time.perf_counter() - started, log.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('trace')
+    parser.add_argument('--delay', type=int, help='delay_minutes setting')
+    parser.add_argument('--percent', type=int, help='battery_percent setting')
+    parser.add_argument('--no-notifications', action='store_true', help='replay without power change notifications')
+    parser.add_argument('--expect', help="seconds after the trace start the trigger must fire at, or 'none'")
+    parser.add_argument('--tolerance', type=float, default=0.0)
+    parser.add_argument('--verbose', action='store_true', help='print the monitor log')
+    args = parser.parse_args()
+
+    config = {}
+    if args.delay is not None:
+        config['delay_minutes'] = args.delay
+    if args.percent is not None:
+        config['battery_percent'] = args.percent
+
+    result = ReplayHarness(load_trace(args.trace), config, not args.no_notifications).run()
+    if args.verbose:
+        print(result.log, end='')
+    after = result.triggered_after
+    print(f"Trigger: {'none' if after is None else f'{after:.1f} s after start'}, "
+          f"{result.evaluations} checks over {result.virtual_seconds / 3600:.1f} h "
+          f"replayed in {result.wall_seconds * 1000:.1f} ms")
+
+    if args.expect is not None:
+        try:
+            result.expect_trigger(None if args.expect == 'none' else float(args.expect), args.tolerance)
+        except AssertionError as e:
+            print(f"FAIL: {str(e).splitlines()[0]}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Shutdown action engine
+Resolves the system shutdown command at startup and runs it without a shell
+"""
+
+import math
+import shlex
+import shutil
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+
+ShutdownResult = namedtuple('ShutdownResult', ['command', 'returncode', 'duration', 'output'])
+
+
+def split_command(command):
+    """argv list of a command line, on Windows backslashes in paths are kept"""
+    if sys.platform != 'win32':
+        return shlex.split(command)
+    # Non-POSIX mode keeps the quotes around an argument, only the quotes are dropped
+    return [arg[1:-1] if len(arg) > 1 and arg[0] == arg[-1] == '"' else arg
+            for arg in shlex.split(command, posix=False)]
+
+
+def _platform_commands():
+    """Shutdown commands for this platform, preferred first"""
+    if sys.platform == 'win32':
+        return (['shutdown', '/s', '/t', '0'],)
+    if sys.platform == 'darwin':
+        return (['sudo', 'shutdown', '-h', 'now'],
+                ['osascript', '-e', 'tell application "System Events" to shut down'])
+    return (['shutdown', '-h', 'now'],
+            ['systemctl', 'poweroff'],
+            ['loginctl', 'poweroff'])
+
+
+class ShutdownAction:
+    """Runs the first shutdown command that succeeds, with fallbacks"""
+
+    COMMAND_TIMEOUT = 15  # seconds per command
+
+    def __init__(self, commands=None):
+        """commands: list of argv lists (or strings) to try instead of the platform defaults"""
+        self.configured = commands
+        self.commands = self._resolve(_platform_commands() if commands is None else commands)
+        if not self.commands and commands is not None:
+            print("No configured shutdown command found, using the platform defaults")
+            self.commands = self._resolve(_platform_commands())
+        if not self.commands:
+            print("Warning: no usable shutdown command found")
+
+    @staticmethod
+    def _resolve(commands):
+        """argv lists with the full program path, for the commands that exist"""
+        resolved = []
+        for command in commands:
+            try:
+                argv = split_command(command) if isinstance(command, str) else list(command)
+            except ValueError as e:
+                print(f"Invalid shutdown command {command!r}, skipped: {e}")
+                continue
+            path = shutil.which(argv[0]) if argv else None
+            if path:
+                resolved.append([path] + argv[1:])
+            else:
+                print(f"Shutdown command not found, skipped: {' '.join(argv)}")
+        return resolved
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Create the action from the 'shutdown_command' setting (None for platform defaults)"""
+        command = config_manager.get('shutdown_command')
+        return cls(None if command is None else [command])
+
+    def is_current(self, config_manager):
+        """Check whether the action still matches the 'shutdown_command' setting"""
+        command = config_manager.get('shutdown_command')
+        return self.configured == (None if command is None else [command])
+
+    def execute(self, triggered_at=None, telemetry=None):
+        """Run shutdown commands until one exits with 0, returns the list of ShutdownResult
+
+        triggered_at: time.time() when shutdown was triggered, to log and record the delay
+        until the command runs.
+        """
+        results = []
+        if not self.commands:
+            print("Error: shutdown not executed, no usable shutdown command found")
+            if telemetry is not None:
+                now = time.time()
+                telemetry.record_shutdown(now, now - triggered_at if triggered_at is not None else math.nan, failed=True)
+            return results
+
+        for command in self.commands:
+            started_at = time.time()
+            if triggered_at is not None and not results:
+                delay = started_at - triggered_at
+                print(f"Executing shutdown {delay:.2f} s after trigger")
+                if telemetry is not None:
+                    telemetry.record_shutdown(started_at, delay)
+
+            started = time.perf_counter()
+            try:
+                completed = subprocess.run(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                           stderr=subprocess.STDOUT, timeout=self.COMMAND_TIMEOUT)
+                result = ShutdownResult(command, completed.returncode, time.perf_counter() - started,
+                                        completed.stdout.decode(errors='replace').strip() or None)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                result = ShutdownResult(command, None, time.perf_counter() - started, str(e))
+            results.append(result)
+
+            print(f"Shutdown command {' '.join(command)} exited with {result.returncode} "
+                  f"in {result.duration * 1000:.0f} ms" + (f": {result.output}" if result.output else ""))
+            if result.returncode == 0:
+                break
+        else:
+            print("Error: shutdown failed, every shutdown command failed")
+            if telemetry is not None:
+                telemetry.record_shutdown(time.time(), math.nan, failed=True)
+        return results
@@ -0,0 +1,31 @@
+"""
+Qt-free signals
+Lets the core modules report events when PyQt5 is not loaded (headless mode)
+"""
+
+
+class Signal:
+    """Minimal stand-in for pyqtSignal: slots are called synchronously on emit"""
+
+    def __init__(self):
+        self._slots = []
+
+    def connect(self, slot):
+        """Connect a callable to the signal"""
+        self._slots.append(slot)
+
+    def disconnect(self, slot):
+        """Disconnect a previously connected callable"""
+        self._slots.remove(slot)
+
+    def emit(self, *args):
+        """Call every connected slot"""
+        for slot in list(self._slots):
+            slot(*args)
+
+
+class MonitorSignals:
+    """Signals emitted by BatteryMonitor, same names as the GUI WorkerSignals"""
+
+    def __init__(self):
+        self.shutdown_triggered = Signal()
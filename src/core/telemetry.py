@@ -0,0 +1,153 @@
+"""
+Power telemetry history
+Fixed-size ring buffer of battery samples persisted in a memory-mapped file
+
+File layout (little-endian, no padding):
+    header  32 bytes   magic '8s', version 'I', record size 'I', capacity 'I',
+                       reserved 'I', total records ever written 'Q'
+    records 24 bytes each, capacity slots
+            timestamp 'd' (unix time), percent 'f', power draw 'f' (W, NaN if unknown),
+            flags 'I' (bit 0: plugged in, bit 1: shutdown event, bit 2: shutdown failed),
+            value 'f' (event specific, for shutdown events: seconds from trigger to running
+            the shutdown command, NaN for failures after a command was run)
+
+Record i (0-based, counting every record ever written) lives in slot i % capacity.
+With the default capacity of 20160 slots (one week at one sample per 30 s) the
+file is 32 + 20160 * 24 = 483872 bytes, no matter how long the app runs.
+Other tools can map the file read-only, e.g. numpy.frombuffer(data, dtype=
+[('timestamp', '<f8'), ('percent', '<f4'), ('power', '<f4'), ('flags', '<u4'),
+('value', '<f4')], offset=32).
+"""
+
+import math
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+
+
+HEADER = struct.Struct('<8sIIIIQ')
+RECORD = struct.Struct('<dffIf')
+MAGIC = b'WPCTELEM'
+FORMAT_VERSION = 2
+TOTAL_OFFSET = HEADER.size - 8
+
+FLAG_PLUGGED = 1
+FLAG_SHUTDOWN = 2
+FLAG_SHUTDOWN_FAILED = 4
+
+
+class TelemetryRing:
+    """Battery sample history stored in a memory-mapped ring buffer"""
+
+    DEFAULT_CAPACITY = 7 * 24 * 60 * 2  # one week at one sample per 30 s
+    SAMPLE_INTERVAL = 30  # seconds between samples unless the plug state changes
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY, readonly=False):
+        self.path = str(path)
+        self.readonly = readonly
+        self.size = HEADER.size + capacity * RECORD.size
+        self._last_timestamp = None
+        self._last_plugged = None
+        self._last_percent = math.nan
+        self._append_lock = threading.Lock()
+
+        if readonly:
+            with open(self.path, 'rb') as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, record_size, self.capacity, _, _ = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != FORMAT_VERSION or record_size != RECORD.size:
+                self._mm.close()
+                raise ValueError(f"Unsupported telemetry file: {self.path}")
+            self.size = len(self._mm)
+            return
+
+        self.capacity = capacity
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != self.size:
+                os.ftruncate(fd, self.size)
+            self._mm = mmap.mmap(fd, self.size, access=mmap.ACCESS_WRITE)
+        finally:
+            os.close(fd)
+
+        header = HEADER.unpack_from(self._mm, 0)
+        if header[:4] != (MAGIC, FORMAT_VERSION, RECORD.size, capacity):
+            # New file or incompatible layout: start an empty history
+            self._mm[:] = bytes(self.size)
+            HEADER.pack_into(self._mm, 0, MAGIC, FORMAT_VERSION, RECORD.size, capacity, 0, 0)
+        self._total = self.total
+
+    @classmethod
+    def open_default(cls):
+        """Open the history file in the application data directory"""
+        app_data_dir = Path.home() / '.win_power_control'
+        app_data_dir.mkdir(exist_ok=True)
+        return cls(app_data_dir / 'telemetry.bin')
+
+    @property
+    def total(self):
+        """Number of records written since the file was created"""
+        return struct.unpack_from('<Q', self._mm, TOTAL_OFFSET)[0]
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, timestamp, percent, power_draw, flags, value=math.nan):
+        """Write one record into the next slot"""
+        with self._append_lock:
+            RECORD.pack_into(self._mm, HEADER.size + (self._total % self.capacity) * RECORD.size,
+                             timestamp, percent, power_draw, flags, value)
+            # Publish the record only after it is fully written
+            self._total += 1
+            struct.pack_into('<Q', self._mm, TOTAL_OFFSET, self._total)
+
+    def add_snapshot(self, snapshot):
+        """Record a BatterySnapshot, at most once per SAMPLE_INTERVAL unless plug state changed
+
+        Suitable as a BatterySampler listener.
+        """
+        if snapshot is None:
+            return
+        plugged = bool(snapshot.power_plugged)
+        if (self._last_timestamp is not None and plugged == self._last_plugged
+                and snapshot.timestamp - self._last_timestamp < self.SAMPLE_INTERVAL):
+            return
+        self._last_timestamp = snapshot.timestamp
+        self._last_plugged = plugged
+        self._last_percent = snapshot.percent
+
+        power_draw = snapshot.power_now / 1e6 if snapshot.power_now is not None else math.nan
+        self.append(snapshot.timestamp, snapshot.percent, power_draw, FLAG_PLUGGED if plugged else 0)
+
+    def record_shutdown(self, timestamp, delay, failed=False):
+        """Record that the shutdown command was run delay seconds after the trigger, or that shutdown failed"""
+        flags = FLAG_SHUTDOWN | (FLAG_SHUTDOWN_FAILED if failed else 0) | (FLAG_PLUGGED if self._last_plugged else 0)
+        self.append(timestamp, self._last_percent, math.nan, flags, delay)
+        self.flush()
+
+    def records(self):
+        """Get a zero-copy view of all record slots (in slot order, not time order)"""
+        return memoryview(self._mm)[HEADER.size:HEADER.size + len(self) * RECORD.size]
+
+    def iter_records(self):
+        """Iterate over (timestamp, percent, power_draw, flags, value) from oldest to newest"""
+        view = memoryview(self._mm)
+        total = self.total
+        count = min(total, self.capacity)
+        start = (total - count) % self.capacity
+        # Oldest records are at the slot after the newest one once the buffer has wrapped
+        for begin, end in ((start, min(start + count, self.capacity)), (0, max(start + count - self.capacity, 0))):
+            if end > begin:
+                yield from RECORD.iter_unpack(view[HEADER.size + begin * RECORD.size:HEADER.size + end * RECORD.size])
+
+    def flush(self):
+        """Write dirty pages to disk"""
+        if not self.readonly:
+            self._mm.flush()
+
+    def close(self):
+        """Flush and unmap the file"""
+        self.flush()
+        self._mm.close()
@@ -5,7 +5,6 @@ Displays user documentation and FAQ
 
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QPushButton, QTextBrowser
 from src.i18n.translations import translator
-from src.i18n.help_content import HELP_CONTENT
 
 
 class HelpDialog(QDialog):
@@ -35,5 +34,7 @@ class HelpDialog(QDialog):
     
     def get_help_content(self):
         """Get help content in current language"""
+        # Help text for all languages is large, load it only when the dialog opens
+        from src.i18n.help_content import HELP_CONTENT
         lang = translator.current_language
         return HELP_CONTENT.get(lang, HELP_CONTENT['en'])
\ No newline at end of file
@@ -4,22 +4,22 @@ Provides user interface for battery monitoring and shutdown control
 """
 
 import time
-import psutil
 import sys
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QCheckBox, QPushButton, QGroupBox,
                              QSystemTrayIcon, QMenu, QDialog, QScrollArea)
 from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QObject
-from PyQt5.QtGui import QIcon, QPixmap, QPainter, QColor
 
+from src.core.battery import battery_sampler
+from src.core.battery_backends import create_backend
 from src.core.config import ConfigManager
+from src.core.loop import core_loop
+from src.core.metrics import metrics
 from src.core.monitor import BatteryMonitor
-from src.gui.settings_dialog import SettingsDialog
-from src.gui.help_dialog import HelpDialog
-from src.gui.error_dialog import show_error
-from src.gui.shutdown_dialog import ShutdownDialog
+from src.core.shutdown import ShutdownAction
+from src.gui.status import render_status, status_state
+from src.gui.tray_icon import TrayIconCache
 from src.i18n.translations import translator
-from src.utils.system import execute_shutdown
 
 
 debug_mode = '--debug' in sys.argv
@@ -27,12 +27,19 @@ debug_mode = '--debug' in sys.argv
 class WorkerSignals(QObject):
     """Signals for communication between threads"""
     shutdown_triggered = pyqtSignal()
+    config_changed = pyqtSignal()
+    cancel_requested = pyqtSignal()
+    show_requested = pyqtSignal()
 
 
 class MainWindow(QMainWindow):
     """Main application window"""
     
-    def __init__(self):
+    PRELOAD_DELAY_MS = 10000
+    NO_STATE = object()  # nothing rendered yet
+    
+    def __init__(self, instance_lock=None):
+        """instance_lock: the acquired InstanceLock, to publish the activation port where needed"""
         super().__init__()
         
         # Initialize configuration
@@ -41,30 +48,82 @@ class MainWindow(QMainWindow):
         # Apply language setting if specified
         if self.config_manager.get('language'):
             translator.set_language(self.config_manager.get('language'))
-            
-        battery = psutil.sensors_battery()
+        
+        battery_sampler.set_backend(create_backend(self.config_manager.get('battery_backend')))
+        battery = battery_sampler.read()
         if not battery:
+            from src.gui.error_dialog import show_error
             show_error(translator.get('battery_not_detected_dialog') if not debug_mode else [translator.get('battery_not_detected_dialog'), "!!! Ignored in debug mode"], parent=self)
             if not debug_mode:
                 exit(0)
             
         
+        # Shutdown command is resolved once, not when the countdown expires
+        self.shutdown_action = ShutdownAction.from_config(self.config_manager)
+        from src.core.hooks import PreShutdownHooks
+        self.hooks = PreShutdownHooks.from_config(self.config_manager)
+        
         # Setup signals
         self.signals = WorkerSignals()
         self.signals.shutdown_triggered.connect(self.show_shutdown_dialog)
+        self.signals.cancel_requested.connect(self.cancel_shutdown_dialog)
+        self.signals.show_requested.connect(self.bring_to_front)
+        self._shutdown_dialog = None
+        
+        # Core tasks (monitor, watchers, hooks) share one asyncio loop next to the Qt loop
+        core_loop.start_thread()
         
         # Start battery monitor
-        self.monitor = BatteryMonitor(self.config_manager.config, self.signals)
+        self.monitor = BatteryMonitor(self.config_manager, self.signals)
         self.monitor.start()
         
+        # Optional Prometheus endpoint, served from the monitor's state
+        from src.core.exporter import MetricsExporter
+        self.exporter = MetricsExporter.from_config(self.monitor, self.config_manager)
+        self.exporter.start()
+        
+        # Local control socket for scripts and `main.py ctl`
+        from src.core import control_client
+        from src.core.control import ActivationListener, ControlServer
+        self.control_server = ControlServer(self.monitor, self.config_manager, on_cancel=self.on_control_cancel)
+        # A second launch asks this instance to show itself instead of starting another monitor
+        self.control_server.register('show', self.on_control_show)
+        self.control_server.start()
+        # Without a control socket (Windows) a second launch finds a loopback port in the lock file
+        self.activation_listener = None
+        if not control_client.is_supported() and instance_lock is not None:
+            self.activation_listener = ActivationListener(self.signals.show_requested.emit)
+            self.activation_listener.start(instance_lock)
+        
+        # Status panel is re-rendered only when its state changes
+        self._status_state = self.NO_STATE
+        self.status_text_updates = 0
+        self._status_stats_since = time.time()
+        self._started_at = self._status_stats_since
+        
+        # Tray icon follows charge level, swapped only when its bucket or state changes
+        self.tray_icon = None
+        self.tray_icons = TrayIconCache()
+        self._tray_key = None
+        
         # Initialize UI
         self.init_ui()
         self.init_tray()
         
+        # Apply edits of the config file made while the app is running
+        self.signals.config_changed.connect(self.on_config_changed)
+        self.config_manager.subscribe(lambda snapshot: self.signals.config_changed.emit())
+        from src.core.config_watcher import ConfigWatcher
+        self.config_watcher = ConfigWatcher(self.config_manager)
+        self.config_watcher.start()
+        
         # Setup status update timer
         self.update_status_timer = QTimer()
         self.update_status_timer.timeout.connect(self.update_status)
         self.update_status_timer.start(1000)
+        
+        # The shutdown dialog must open without import delay, load it once startup is over
+        QTimer.singleShot(self.PRELOAD_DELAY_MS, self.preload_shutdown_dialog)
     
     def init_ui(self):
         """Initialize user interface"""
@@ -150,7 +209,8 @@ class MainWindow(QMainWindow):
     
     def init_tray(self):
         """Initialize system tray icon"""
-        icon = self.create_icon()
+        self._tray_key = TrayIconCache.key_for(self._status_state)
+        icon = self.tray_icons.get(self._tray_key)
         
         self.tray_icon = QSystemTrayIcon(icon, self)
         
@@ -159,6 +219,10 @@ class MainWindow(QMainWindow):
         show_action = tray_menu.addAction(translator.get('settings_button').replace('⚙️ ', ''))
         show_action.triggered.connect(self.show)
         
+        if metrics.enabled:
+            dump_action = tray_menu.addAction(translator.get('dump_statistics'))
+            dump_action.triggered.connect(self.dump_statistics)
+        
         quit_action = tray_menu.addAction(translator.get('exit_button'))
         quit_action.triggered.connect(self.quit_application)
         
@@ -166,24 +230,6 @@ class MainWindow(QMainWindow):
         self.tray_icon.activated.connect(self.on_tray_activated)
         self.tray_icon.show()
     
-    def create_icon(self):
-        """Create simple battery icon"""
-        pixmap = QPixmap(64, 64)
-        pixmap.fill(Qt.transparent)
-        
-        painter = QPainter(pixmap)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        # Draw battery
-        painter.setBrush(QColor(100, 150, 255))
-        painter.setPen(QColor(50, 100, 200))
-        painter.drawRoundedRect(8, 20, 40, 24, 4, 4)
-        painter.drawRect(48, 28, 8, 8)
-        
-        painter.end()
-        
-        return QIcon(pixmap)
-    
     def on_tray_activated(self, reason):
         """Handle tray icon activation"""
         if reason == QSystemTrayIcon.DoubleClick:
@@ -203,51 +249,98 @@ class MainWindow(QMainWindow):
                 2000
             )
     
+    def on_config_changed(self):
+        """Reflect configuration changes in the UI"""
+        self.enable_checkbox.blockSignals(True)
+        self.enable_checkbox.setChecked(self.config_manager.get('enabled'))
+        self.enable_checkbox.blockSignals(False)
+        if not self.shutdown_action.is_current(self.config_manager):
+            self.shutdown_action = ShutdownAction.from_config(self.config_manager)
+        if not self.hooks.is_current(self.config_manager):
+            from src.core.hooks import PreShutdownHooks
+            self.hooks = PreShutdownHooks.from_config(self.config_manager)
+        if not self.exporter.is_current(self.config_manager):
+            self.exporter.stop()
+            from src.core.exporter import MetricsExporter
+            self.exporter = MetricsExporter.from_config(self.monitor, self.config_manager)
+            self.exporter.start()
+        self.update_status()
+    
     def show_settings(self):
         """Show settings dialog"""
+        # Dialogs are imported on first use to keep startup fast
+        from src.gui.settings_dialog import SettingsDialog
         dialog = SettingsDialog(self, self.config_manager)
         dialog.exec_()
     
     def show_help(self):
         """Show help dialog"""
+        from src.gui.help_dialog import HelpDialog
         help_dialog = HelpDialog(self)
         help_dialog.exec_()
     
     def update_status(self):
-        """Update status display"""
-        battery = psutil.sensors_battery()
-        
-        if battery:
-            status = translator.get('power_connected') if battery.power_plugged else translator.get('power_battery')
-            percent = battery.percent
-            
-            status_text = f'{translator.get("battery_charge")}: {status}\n'
-            status_text += f'{translator.get("battery_charge")}: {percent}%\n'
-            
-            if self.config_manager.get('enabled'):
-                status_text += f'\n{translator.get("auto_shutdown_enabled")}'
-                if not battery.power_plugged and self.monitor.timer_started:
-                    remaining = int(self.monitor.shutdown_time - time.time())
-                    if remaining > 0:
-                        mins = remaining // 60
-                        secs = remaining % 60
-                        status_text += f'\n{translator.get("time_until_shutdown")}: '
-                        status_text += f'{mins} {translator.get("minutes_short")} '
-                        status_text += f'{secs} {translator.get("seconds_short")}'
-            else:
-                status_text += f'\n{translator.get("auto_shutdown_disabled")}'
-            
-            self.status_label.setText(status_text)
-        else:
-            self.status_label.setText(translator.get('battery_not_detected'))
+        """Update status display, the label is only touched when the shown state changes"""
+        started = metrics.start()
+        now = time.time()
+        battery = battery_sampler.read()
+        state = status_state(battery, self.config_manager.get('enabled'), self.monitor, now)
+        
+        if state != self._status_state:
+            self._status_state = state
+            self.status_label.setText(render_status(state))
+            self.status_text_updates += 1
+            self.update_tray_icon()
+        metrics.observe('gui.update_status', started)
+        
+        if debug_mode and now - self._status_stats_since >= 60:
+            repaints_per_hour = self.tray_icons.repaints * 3600 / (now - self._started_at)
+            print(f"Status label updates in the last minute: {self.status_text_updates}, "
+                  f"tray icon repaints: {self.tray_icons.repaints} ({repaints_per_hour:.1f}/h)")
+            self.status_text_updates = 0
+            self._status_stats_since = now
+    
+    def dump_statistics(self):
+        """Write the --profile statistics to a file and say where"""
+        try:
+            path = metrics.dump()
+        except OSError as e:
+            print(f"Error writing statistics: {e}")
+            return
+        self.tray_icon.showMessage(translator.get('dump_statistics'), path, QSystemTrayIcon.Information, 3000)
+    
+    def update_tray_icon(self):
+        """Swap the tray icon if the displayed charge bucket or state changed"""
+        if self.tray_icon is None:
+            return
+        key = TrayIconCache.key_for(self._status_state)
+        if key != self._tray_key:
+            self._tray_key = key
+            self.tray_icon.setIcon(self.tray_icons.get(key))
+    
+    def preload_shutdown_dialog(self):
+        """Import the shutdown dialog and resolve the alert sound player ahead of time"""
+        import src.gui.shutdown_dialog  # noqa: F401
+        from src.utils.system import get_alert_player
+        get_alert_player()
     
     def show_shutdown_dialog(self):
         """Show shutdown warning dialog"""
+        from src.gui.shutdown_dialog import ShutdownDialog
         dialog = ShutdownDialog(self, self.config_manager.get('sound_enabled'))
+        self._shutdown_dialog = dialog
+        # Hooks run while the dialog counts down and must finish by the time it expires
+        hooks = self.hooks
+        hooks.start(ShutdownDialog.COUNTDOWN_SECONDS)
         result = dialog.exec_()
+        self._shutdown_dialog = None
+        
+        if result != QDialog.Accepted:
+            hooks.cancel()
         
         if dialog.cancelled:
             # User cancelled shutdown
+            self.monitor.record_cancellation()
             self.config_manager.set('enabled', False)
             self.enable_checkbox.setChecked(False)
             self.config_manager.save()
@@ -260,7 +353,32 @@ class MainWindow(QMainWindow):
             )
         elif result == QDialog.Accepted:
             # Timer expired, execute shutdown
-            execute_shutdown()
+            hooks.wait()
+            self.config_manager.flush()
+            self.shutdown_action.execute(self.monitor.triggered_at, self.monitor.telemetry)
+    
+    def on_control_show(self, request):
+        """Show the window for a control request (called on the core loop)"""
+        self.signals.show_requested.emit()
+        return {}
+    
+    def bring_to_front(self):
+        """Show, raise and focus the window"""
+        self.show()
+        self.raise_()
+        self.activateWindow()
+    
+    def on_control_cancel(self):
+        """Dismiss the shutdown warning for a control request (called on the core loop)"""
+        if self._shutdown_dialog is None:
+            return False
+        self.signals.cancel_requested.emit()
+        return True
+    
+    def cancel_shutdown_dialog(self):
+        """Cancel the shutdown warning if it is shown"""
+        if self._shutdown_dialog is not None:
+            self._shutdown_dialog.cancel_shutdown()
     
     def closeEvent(self, event):
         """Handle window close event - minimize to tray"""
@@ -276,6 +394,15 @@ class MainWindow(QMainWindow):
     def quit_application(self):
         """Completely quit application"""
         self.monitor.stop()
+        self.config_watcher.stop()
+        self.exporter.stop()
+        self.control_server.stop()
+        if self.activation_listener is not None:
+            self.activation_listener.stop()
+        core_loop.stop()
+        self.config_manager.flush()
+        if metrics.enabled:
+            self.dump_statistics()
         self.tray_icon.hide()
         from PyQt5.QtWidgets import QApplication
         QApplication.quit()
\ No newline at end of file
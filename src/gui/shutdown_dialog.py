@@ -6,14 +6,15 @@ Displays countdown before shutdown with cancel option
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QPushButton, QProgressBar
 from PyQt5.QtCore import QTimer, Qt
 from PyQt5.QtGui import QFont
+from src.core.countdown import ShutdownCountdown
 from src.i18n.translations import translator
-from src.utils.system import play_alert_sound
+from src.utils.system import get_alert_player
 
 
 class ShutdownDialog(QDialog):
     """Dialog that warns user about impending shutdown"""
     
-    COUNTDOWN_SECONDS = 30
+    COUNTDOWN_SECONDS = ShutdownCountdown.COUNTDOWN_SECONDS
     
     def __init__(self, parent=None, play_sound=False):
         super().__init__(parent)
@@ -21,11 +22,14 @@ class ShutdownDialog(QDialog):
         self.remaining_time = self.COUNTDOWN_SECONDS
         self.play_sound = play_sound
         
+        self.alert_player = get_alert_player() if self.play_sound else None
+        
         self.init_ui()
         self.setup_timer()
         
-        if self.play_sound:
-            play_alert_sound()
+        if self.alert_player:
+            # Plays in the background and repeats until the dialog closes
+            self.alert_player.start_repeating()
     
     def init_ui(self):
         """Initialize user interface"""
@@ -105,6 +109,12 @@ class ShutdownDialog(QDialog):
             self.timer.stop()
             self.accept()
     
+    def done(self, result):
+        """Stop alerts whenever the dialog closes"""
+        if self.alert_player:
+            self.alert_player.stop()
+        super().done(result)
+    
     def cancel_shutdown(self):
         """Cancel shutdown when user clicks button"""
         self.cancelled = True
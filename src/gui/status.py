@@ -0,0 +1,61 @@
+"""
+Status panel model
+Reduces monitor state to a small tuple and renders the status text from it (no Qt)
+"""
+
+from src.i18n.translations import translator
+
+
+def status_state(battery, enabled, monitor, now):
+    """Get the displayed state as a tuple, equal tuples render to the same text
+
+    (plugged, percent, runtime_minutes, enabled, remaining_seconds), or None without a battery.
+    """
+    if not battery:
+        return None
+
+    runtime_minutes = None
+    if not battery.power_plugged:
+        runtime = monitor.estimator.remaining_runtime(now)
+        if runtime is not None:
+            runtime_minutes = int(runtime) // 60
+
+    remaining = None
+    shutdown_time = monitor.shutdown_time
+    if enabled and not battery.power_plugged and monitor.timer_started and shutdown_time is not None:
+        remaining = int(shutdown_time - now)
+        if remaining <= 0:
+            remaining = None
+
+    return battery.power_plugged, battery.percent, runtime_minutes, enabled, remaining
+
+
+def render_status(state):
+    """Build the status panel text for a state tuple"""
+    if state is None:
+        return translator.get('battery_not_detected')
+
+    plugged, percent, runtime_minutes, enabled, remaining = state
+    status = translator.get('power_connected') if plugged else translator.get('power_battery')
+
+    status_text = f'{translator.get("battery_charge")}: {status}\n'
+    status_text += f'{translator.get("battery_charge")}: {percent}%\n'
+
+    if runtime_minutes is not None:
+        hours = runtime_minutes // 60
+        mins = runtime_minutes % 60
+        status_text += f'{translator.get("estimated_runtime")}: '
+        status_text += f'{hours} {translator.get("hours_short")} {mins} {translator.get("minutes_short")}\n'
+
+    if enabled:
+        status_text += f'\n{translator.get("auto_shutdown_enabled")}'
+        if remaining is not None:
+            mins = remaining // 60
+            secs = remaining % 60
+            status_text += f'\n{translator.get("time_until_shutdown")}: '
+            status_text += f'{mins} {translator.get("minutes_short")} '
+            status_text += f'{secs} {translator.get("seconds_short")}'
+    else:
+        status_text += f'\n{translator.get("auto_shutdown_disabled")}'
+
+    return status_text
@@ -0,0 +1,85 @@
+"""
+Tray icon rendering
+Battery icons showing charge level and power state, cached per level bucket
+"""
+
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QIcon, QPixmap, QPainter, QColor
+
+
+class TrayIconCache:
+    """Small LRU cache of rendered tray icons keyed by (bucket, state)"""
+
+    MAX_SIZE = 16
+    BUCKET_SIZE = 10  # percent per charge level step
+
+    # state -> (fill, outline)
+    COLORS = {
+        'plugged': (QColor(100, 150, 255), QColor(50, 100, 200)),
+        'battery': (QColor(80, 190, 90), QColor(40, 130, 50)),
+        'low': (QColor(240, 160, 40), QColor(180, 110, 20)),
+        'countdown': (QColor(230, 60, 60), QColor(170, 20, 20)),
+        'unknown': (QColor(160, 160, 160), QColor(110, 110, 110)),
+    }
+    LOW_BUCKET = 2
+
+    def __init__(self, max_size=MAX_SIZE):
+        self.max_size = max_size
+        self._icons = OrderedDict()
+        self.repaints = 0
+
+    @classmethod
+    def key_for(cls, state):
+        """Get the cache key for a status_state() tuple"""
+        if state is None:
+            return None, 'unknown'
+        plugged, percent, _, _, remaining = state
+        bucket = min(int(percent) // cls.BUCKET_SIZE, 100 // cls.BUCKET_SIZE)
+        if remaining is not None:
+            return bucket, 'countdown'
+        if plugged:
+            return bucket, 'plugged'
+        return bucket, 'low' if bucket < cls.LOW_BUCKET else 'battery'
+
+    def get(self, key):
+        """Get the icon for a key, rendering it only on a cache miss"""
+        icon = self._icons.get(key)
+        if icon is not None:
+            self._icons.move_to_end(key)
+            return icon
+
+        icon = self.render(*key)
+        self.repaints += 1
+        self._icons[key] = icon
+        if len(self._icons) > self.max_size:
+            self._icons.popitem(last=False)
+        return icon
+
+    def render(self, bucket, state):
+        """Paint a battery icon filled to the bucket level"""
+        fill, outline = self.COLORS[state]
+        pixmap = QPixmap(64, 64)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Battery body and terminal
+        painter.setBrush(Qt.NoBrush)
+        painter.setPen(outline)
+        painter.drawRoundedRect(8, 20, 40, 24, 4, 4)
+        painter.setBrush(outline)
+        painter.drawRect(48, 28, 8, 8)
+
+        # Charge level (full body when the level is unknown)
+        level = 1.0 if bucket is None else bucket * self.BUCKET_SIZE / 100
+        width = max(int(36 * level), 2)
+        painter.setBrush(fill)
+        painter.setPen(Qt.NoPen)
+        painter.drawRoundedRect(10, 22, width, 20, 3, 3)
+
+        painter.end()
+
+        return QIcon(pixmap)
@@ -4,6 +4,7 @@ Supports English, Russian, and Ukrainian languages
 """
 
 import locale
+import string
 
 # Translation dictionaries
 TRANSLATIONS = {
@@ -22,6 +23,7 @@ TRANSLATIONS = {
         'settings_button': '⚙️ Settings',
         'help_button': '📖 Help (FAQ)',
         'exit_button': 'Completely close application',
+        'dump_statistics': 'Save performance statistics',
         
         # Status messages
         'power_connected': 'Connected to AC power',
@@ -32,6 +34,8 @@ TRANSLATIONS = {
         'time_until_shutdown': '⏱ Time until shutdown',
         'minutes_short': 'min',
         'seconds_short': 'sec',
+        'hours_short': 'h',
+        'estimated_runtime': '🔋 Estimated runtime',
         'battery_not_detected': '⚠️ Battery not detected',
         'battery_not_detected_dialog': '⚠️ Battery not detected. Without this system cannot function. The application will be closed.',
         
@@ -86,6 +90,7 @@ TRANSLATIONS = {
         'settings_button': '⚙️ Настройки',
         'help_button': '📖 Помощь (FAQ)',
         'exit_button': 'Полностью закрыть приложение',
+        'dump_statistics': 'Сохранить статистику производительности',
         
         # Статусные сообщения
         'power_connected': 'Подключено к сети',
@@ -96,6 +101,8 @@ TRANSLATIONS = {
         'time_until_shutdown': '⏱ До выключения',
         'minutes_short': 'мин',
         'seconds_short': 'сек',
+        'hours_short': 'ч',
+        'estimated_runtime': '🔋 Осталось работы',
         'battery_not_detected': '⚠️ Батарея не обнаружена',
         'battery_not_detected_dialog': '⚠️ Батарея не обнаружена. Без этого система не может работать. Приложение будет закрыто.',
         
@@ -150,6 +157,7 @@ TRANSLATIONS = {
         'settings_button': '⚙️ Налаштування',
         'help_button': '📖 Довідка (FAQ)',
         'exit_button': 'Повністю закрити додаток',
+        'dump_statistics': 'Зберегти статистику продуктивності',
         
         # Статусні повідомлення
         'power_connected': 'Підключено до мережі',
@@ -160,6 +168,8 @@ TRANSLATIONS = {
         'time_until_shutdown': '⏱ До вимикання',
         'minutes_short': 'хв',
         'seconds_short': 'сек',
+        'hours_short': 'год',
+        'estimated_runtime': '🔋 Залишилось роботи',
         'battery_not_detected': '⚠️ Батарею не виявлено',
         'battery_not_detected_dialog': '⚠️ Батарею не виявлено. Без неї система не може працювати. Додаток буде закрито.',
         
@@ -202,11 +212,19 @@ TRANSLATIONS = {
 }
 
 
+_formatter = string.Formatter()
+
+
 class Translator:
-    """Handles application translations"""
+    """Handles application translations
+    
+    Each language is compiled once into a flat catalog with English fallbacks
+    merged in and format templates pre-parsed, so get() is a single lookup.
+    """
     
     def __init__(self):
         self.current_language = self._detect_system_language()
+        self._catalog, self._templates = self._compile(self.current_language)
     
     def _detect_system_language(self):
         """Detect system language and set appropriate translation"""
@@ -220,17 +238,59 @@ class Translator:
             pass
         return 'en'  # Default to English
     
+    @staticmethod
+    def missing_keys(lang_code):
+        """Get keys that fall back to English in the given language"""
+        return sorted(set(TRANSLATIONS['en']) - set(TRANSLATIONS.get(lang_code, {})))
+    
+    def _compile(self, lang_code):
+        """Build (catalog, templates) for a language"""
+        missing = self.missing_keys(lang_code)
+        if missing:
+            print(f"Translation '{lang_code}' is missing keys, using English: {', '.join(missing)}")
+        
+        catalog = dict(TRANSLATIONS['en'])
+        catalog.update(TRANSLATIONS.get(lang_code, {}))
+        
+        # Templates: (parts, ((index, field name), ...)) for strings with plain {name} fields only,
+        # formatting fills the field slots of a copy of parts
+        templates = {}
+        for key, text in catalog.items():
+            if '{' not in text:
+                continue
+            parsed = list(_formatter.parse(text))
+            if not all(conversion is None and not spec and (field is None or field.isidentifier())
+                       for _, field, spec, conversion in parsed):
+                continue
+            parts, fields = [], []
+            for literal, field, _, _ in parsed:
+                if literal:
+                    parts.append(literal)
+                if field is not None:
+                    fields.append((len(parts), field))
+                    parts.append(None)
+            templates[key] = (parts, tuple(fields))
+        return catalog, templates
+    
     def get(self, key, **kwargs):
         """Get translated string by key with optional formatting"""
-        translation = TRANSLATIONS.get(self.current_language, TRANSLATIONS['en']).get(key, key)
+        translation = self._catalog.get(key, key)
         if kwargs:
-            return translation.format(**kwargs)
+            template = self._templates.get(key)
+            if template is None:
+                return translation.format(**kwargs)
+            parts, fields = template
+            parts = parts[:]
+            for index, field in fields:
+                parts[index] = str(kwargs[field])
+            return ''.join(parts)
         return translation
     
     def set_language(self, lang_code):
         """Manually set language"""
         if lang_code in TRANSLATIONS:
             self.current_language = lang_code
+            self._catalog, self._templates = self._compile(lang_code)
     
     def get_available_languages(self):
         """Get list of available language codes"""
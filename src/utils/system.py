@@ -5,34 +5,107 @@ Contains system-specific functions for shutdown, autostart, etc.
 
 import sys
 import os
-import winreg
+import shutil
+import subprocess
+import threading
 
+if sys.platform == 'win32':
+    import winreg
 
-def execute_shutdown():
-    """Execute system shutdown command"""
-    if sys.platform == 'win32':
-        os.system('shutdown /s /t 0')
-    elif sys.platform == 'darwin':
-        os.system('sudo shutdown -h now')
-    else:
-        os.system('shutdown -h now')
 
+def execute_shutdown(triggered_at=None):
+    """Execute system shutdown command, returns the list of ShutdownResult"""
+    from src.core.shutdown import ShutdownAction
+    return ShutdownAction().execute(triggered_at)
 
-def play_alert_sound():
-    """Play system alert sound"""
-    try:
+
+class AlertPlayer:
+    """Plays alert sounds in the background with a player resolved once"""
+
+    REPEAT_INTERVAL = 10  # seconds between repeated alerts
+    PLAYER_TIMEOUT = 5  # seconds
+    MACOS_SOUND = '/System/Library/Sounds/Glass.aiff'
+    LINUX_SOUNDS = (
+        '/usr/share/sounds/freedesktop/stereo/alarm-clock-elapsed.oga',
+        '/usr/share/sounds/freedesktop/stereo/bell.oga',
+    )
+
+    def __init__(self):
+        self.command = self._resolve_command()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def _resolve_command(cls):
+        """Find the sound player: argv list, 'winsound' or None for the terminal bell"""
         if sys.platform == 'win32':
-            import winsound
-            winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
-        elif sys.platform == 'darwin':
-            os.system('afplay /System/Library/Sounds/Glass.aiff')
-        else:  # Linux
-            if os.system('which beep') == 0:
-                os.system('beep')
+            return 'winsound'
+        if sys.platform == 'darwin':
+            return ['afplay', cls.MACOS_SOUND] if shutil.which('afplay') else None
+
+        # Linux
+        if shutil.which('beep'):
+            return ['beep']
+        if shutil.which('paplay'):
+            for sound in cls.LINUX_SOUNDS:
+                if os.path.exists(sound):
+                    return ['paplay', sound]
+        if shutil.which('canberra-gtk-play'):
+            return ['canberra-gtk-play', '-i', 'bell']
+        return None
+
+    def _play_once(self):
+        """Play the alert on the current thread"""
+        try:
+            if self.command == 'winsound':
+                import winsound
+                winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
+            elif self.command:
+                subprocess.run(self.command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, timeout=self.PLAYER_TIMEOUT)
             else:
-                os.system('echo -e "\a"')
-    except Exception as e:
-        print(f"Error playing sound: {e}")
+                sys.stdout.write('\a')
+                sys.stdout.flush()
+        except Exception as e:
+            print(f"Error playing sound: {e}")
+
+    def _start(self, target):
+        self.stop()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=target, args=(self._stop_event,), daemon=True)
+        self._thread.start()
+
+    def play(self):
+        """Play the alert once without blocking"""
+        self._start(lambda stop_event: self._play_once())
+
+    def start_repeating(self, interval=REPEAT_INTERVAL):
+        """Play the alert now and then every interval seconds until stop()"""
+        def loop(stop_event):
+            while not stop_event.is_set():
+                self._play_once()
+                stop_event.wait(interval)
+        self._start(loop)
+
+    def stop(self):
+        """Stop repeating alerts (a sound already playing finishes)"""
+        self._stop_event.set()
+
+
+_alert_player = None
+
+
+def get_alert_player():
+    """Get the shared alert player, resolving the sound player on first call"""
+    global _alert_player
+    if _alert_player is None:
+        _alert_player = AlertPlayer()
+    return _alert_player
+
+
+def play_alert_sound():
+    """Play system alert sound without blocking"""
+    get_alert_player().play()
 
 
 
@@ -0,0 +1,25 @@
+"""
+Shared fixtures
+"""
+
+import sys
+
+import pytest
+
+from src.core import loop as loop_module
+from src.core.loop import CoreLoop
+
+
+@pytest.fixture
+def core_loop(monkeypatch):
+    """A core loop thread of its own in place of the global one, stopped and joined afterwards"""
+    loop, shared = CoreLoop(), loop_module.core_loop
+    for module in list(sys.modules.values()):
+        if getattr(module, 'core_loop', None) is shared:
+            monkeypatch.setattr(module, 'core_loop', loop)
+    loop.start_thread()
+    thread = loop._thread
+    yield loop
+    loop.stop()
+    thread.join(CoreLoop.STOP_TIMEOUT * 2)
+    assert not thread.is_alive(), "core loop thread did not stop"
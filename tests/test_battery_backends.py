@@ -0,0 +1,36 @@
+"""
+Sysfs battery backend units
+energy_now is always uWh and power_now uW, charge-based batteries are converted
+"""
+
+import os
+
+from src.core.battery_backends import POWER_TIME_UNKNOWN, SysfsBackend
+
+
+def make_supply(root, attrs):
+    """Create a BAT0 on battery power under a fake power_supply tree"""
+    os.mkdir(os.path.join(root, 'BAT0'))
+    for attr, value in dict({'type': 'Battery', 'status': 'Discharging'}, **attrs).items():
+        with open(os.path.join(root, 'BAT0', attr), 'w') as f:
+            f.write(f"{value}\n")
+    return SysfsBackend(str(root))
+
+
+def test_energy_attributes(tmp_path):
+    snapshot = make_supply(tmp_path, {'capacity': 80, 'energy_now': 40000000, 'power_now': 10000000}).read()
+    assert (snapshot.energy_now, snapshot.power_now, snapshot.secsleft) == (40000000, 10000000, 4 * 3600)
+
+
+def test_charge_attributes_are_converted_with_voltage(tmp_path):
+    # 3 Ah and 1.5 A at 12 V: 36 Wh and 18 W
+    backend = make_supply(tmp_path, {'capacity': 60, 'charge_now': 3000000, 'current_now': 1500000,
+                                     'voltage_now': 12000000})
+    snapshot = backend.read()
+    assert (snapshot.energy_now, snapshot.power_now, snapshot.secsleft) == (36000000, 18000000, 2 * 3600)
+
+
+def test_charge_attributes_without_voltage_are_unknown(tmp_path):
+    snapshot = make_supply(tmp_path, {'charge_now': 3000000, 'charge_full': 4000000, 'current_now': 1500000}).read()
+    assert snapshot.percent == 75
+    assert (snapshot.energy_now, snapshot.power_now, snapshot.secsleft) == (None, None, POWER_TIME_UNKNOWN)
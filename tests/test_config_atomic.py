@@ -0,0 +1,55 @@
+"""
+Crash safety of the config file
+A process killed while saving never leaves a truncated or half-written config.json
+"""
+
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Saves as fast as it can, with enough data that a write takes a while
+WRITER = """
+from src.core.config import ConfigManager
+manager = ConfigManager()
+n = 0
+while True:
+    n += 1
+    manager.update({'delay_minutes': n % 60 + 1, 'pre_shutdown_hooks': ['echo %d' % i for i in range(n % 500, n % 500 + 2000)]})
+    manager.save()
+    manager.flush()
+"""
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGKILL'), reason="needs SIGKILL")
+def test_config_survives_sigkill_during_save(tmp_path):
+    config_file = tmp_path / '.win_power_control' / 'config.json'
+    env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=ROOT)
+    rng = random.Random(9)
+
+    for _ in range(20):
+        # Every save replaces the file, so a new inode means this writer got going
+        previous = config_file.stat().st_ino if config_file.exists() else None
+        process = subprocess.Popen([sys.executable, '-c', WRITER], cwd=ROOT, env=env)
+        try:
+            deadline = time.monotonic() + 30
+            while not config_file.exists() or config_file.stat().st_ino == previous:
+                assert process.poll() is None, "writer exited"
+                assert time.monotonic() < deadline, "writer never saved"
+                time.sleep(0.005)
+            time.sleep(rng.uniform(0, 0.05))
+        finally:
+            process.send_signal(signal.SIGKILL)
+            process.wait()
+
+        with open(config_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        assert len(data['pre_shutdown_hooks']) == 2000
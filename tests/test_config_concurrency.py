@@ -0,0 +1,116 @@
+"""
+Configuration snapshots under concurrent updates
+Readers and the monitor always see whole updates, and versions never go back
+"""
+
+import sys
+import threading
+
+import pytest
+
+from src.core.battery_backends import BatterySnapshot
+from src.core.config import ConfigManager
+from src.core.monitor import BatteryMonitor
+from src.core.signals import MonitorSignals
+
+
+UPDATES = 20000
+
+
+@pytest.fixture
+def config_manager(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    manager = ConfigManager()
+    # Both settings start equal, like every update below keeps them
+    manager.update({'enabled': True, 'delay_minutes': 1, 'battery_percent': 1})
+    return manager
+
+
+@pytest.fixture(autouse=True)
+def frequent_switches():
+    # Switch threads as often as possible to interleave the updates with the reads
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+class PairCheckingSource:
+    """Battery source that checks the monitor's settings in the middle of an evaluation"""
+
+    def __init__(self):
+        self.monitor = None
+        self.errors = []
+        self.reads = 0
+
+    def read(self):
+        config = self.monitor.config
+        if config['delay_minutes'] != config['battery_percent']:
+            self.errors.append(dict(config))
+        self.reads += 1
+        return BatterySnapshot(50.0, None, True, 0.0)
+
+
+def run_threads(writers, readers):
+    """Run the writers until they finish and the readers until then"""
+    done = threading.Event()
+    threads = [threading.Thread(target=writer) for writer in writers]
+    threads += [threading.Thread(target=reader, args=(done,)) for reader in readers]
+    for thread in threads:
+        thread.start()
+    for thread in threads[:len(writers)]:
+        thread.join()
+    done.set()
+    for thread in threads[len(writers):]:
+        thread.join()
+
+
+def writer(config_manager, offset):
+    """Change both settings together, always to the same value"""
+    def run():
+        for n in range(UPDATES):
+            value = (n + offset) % 60 + 1
+            config_manager.update({'delay_minutes': value, 'battery_percent': value})
+    return run
+
+
+def test_snapshots_are_consistent_and_versions_increase(config_manager):
+    errors = []
+    reads = []
+
+    def reader(done):
+        last_version = 0
+        count = 0
+        while not done.is_set():
+            snapshot = config_manager.snapshot
+            if snapshot['delay_minutes'] != snapshot['battery_percent']:
+                errors.append(f"torn snapshot {dict(snapshot)}")
+            if snapshot.version < last_version:
+                errors.append(f"version went from {last_version} to {snapshot.version}")
+            last_version = snapshot.version
+            count += 1
+        reads.append(count)
+
+    run_threads([writer(config_manager, 0), writer(config_manager, 30)], [reader, reader])
+
+    assert not errors, errors[:5]
+    assert min(reads) > 0
+    assert config_manager.snapshot.version > 1
+
+
+def test_monitor_evaluates_whole_updates(config_manager):
+    source = PairCheckingSource()
+    monitor = BatteryMonitor(config_manager, MonitorSignals(), battery_source=source)
+    source.monitor = monitor
+    versions = []
+
+    def evaluator(done):
+        while not done.is_set():
+            monitor.evaluate()
+            versions.append(monitor.config.version)
+
+    run_threads([writer(config_manager, 0), writer(config_manager, 30)], [evaluator])
+
+    assert not source.errors, source.errors[:5]
+    assert source.reads > 0
+    assert versions == sorted(versions)
@@ -0,0 +1,77 @@
+"""
+Background config saving
+A burst of changes is written once, after the settings have been quiet for SAVE_DELAY
+"""
+
+import gc
+import time
+import weakref
+
+import pytest
+
+from src.core import config as config_module
+from src.core.config import ConfigManager
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    manager = ConfigManager()
+    manager.SAVE_DELAY = 0.2
+    manager.writes = []
+    write_atomic = manager._write_atomic
+
+    def counting_write(data):
+        manager.writes.append(time.monotonic())
+        write_atomic(data)
+
+    manager._write_atomic = counting_write
+    return manager
+
+
+def wait_for_writes(manager, count, timeout=5):
+    deadline = time.monotonic() + timeout
+    while len(manager.writes) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_burst_is_written_once(manager):
+    # The burst lasts longer than SAVE_DELAY, only the gaps between changes are shorter
+    for n in range(10):
+        manager.update({'delay_minutes': n + 1})
+        manager.save()
+        time.sleep(0.05)
+    last_change = time.monotonic()
+
+    wait_for_writes(manager, 1)
+    time.sleep(manager.SAVE_DELAY * 2)
+    assert len(manager.writes) == 1
+    assert manager.writes[0] >= last_change + manager.SAVE_DELAY - 0.05 - 0.01
+    assert manager.load()['delay_minutes'] == 10
+
+
+def test_separate_bursts_are_written_separately(manager):
+    for value in (1, 2):
+        manager.update({'delay_minutes': value})
+        manager.save()
+        wait_for_writes(manager, value)
+    assert len(manager.writes) == 2
+
+
+def test_flush_writes_at_once(manager):
+    manager.update({'delay_minutes': 7})
+    manager.save()
+    manager.flush()
+    assert len(manager.writes) == 1
+    time.sleep(manager.SAVE_DELAY * 2)
+    assert len(manager.writes) == 1
+
+
+def test_exit_flush_does_not_keep_managers_alive(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    manager = ConfigManager()
+    assert manager in config_module._managers
+    ref = weakref.ref(manager)
+    del manager
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,47 @@
+"""
+Shutdown countdown and core loop startup
+"""
+
+import asyncio
+
+import pytest
+
+from src.core import loop as loop_module
+from src.core.countdown import ShutdownCountdown
+from src.core.loop import CoreLoop
+
+
+def test_countdown_expires():
+    ticks = []
+    countdown = ShutdownCountdown(seconds=1, on_tick=ticks.append)
+    assert asyncio.run(countdown.run_async()) is True
+    assert ticks == [1] and countdown.remaining == 0
+
+
+def test_cancel_before_run():
+    countdown = ShutdownCountdown()
+    countdown.cancel()
+    assert asyncio.run(countdown.run_async()) is False
+
+
+def test_cancel_while_running():
+    async def run():
+        countdown = ShutdownCountdown()
+        asyncio.get_running_loop().call_later(0.01, countdown.cancel)
+        return await countdown.run_async(), countdown
+
+    expired, countdown = asyncio.run(run())
+    assert not expired and countdown.cancelled and countdown.remaining == ShutdownCountdown.COUNTDOWN_SECONDS
+
+
+@pytest.mark.filterwarnings('ignore::pytest.PytestUnhandledThreadExceptionWarning')
+def test_start_thread_raises_instead_of_hanging(monkeypatch):
+    def failing_profile_thread():
+        raise ValueError("profiler already active")
+    monkeypatch.setattr(loop_module.metrics, 'profile_thread', failing_profile_thread)
+
+    core = CoreLoop()
+    with pytest.raises(RuntimeError) as info:
+        core.start_thread()
+    core._thread.join()
+    assert isinstance(info.value.__cause__, ValueError)
@@ -0,0 +1,64 @@
+"""
+Headless shutdown path
+The shutdown commands run off the core loop, which keeps serving while they block
+"""
+
+import asyncio
+import threading
+import time
+
+from src.core import daemon
+from src.core.countdown import ShutdownCountdown
+from src.core.hooks import PreShutdownHooks
+from src.core.replay import StaticConfig
+
+
+class ExpiredCountdown(ShutdownCountdown):
+    """Countdown that expires at once"""
+
+    async def run_async(self):
+        return True
+
+
+class Stub:
+    """Object with the given attributes"""
+
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+class BlockingAction:
+    """Shutdown action whose commands take a while, records the thread they ran on"""
+
+    def __init__(self):
+        self.thread = None
+
+    def execute(self, triggered_at=None, telemetry=None):
+        self.thread = threading.current_thread()
+        time.sleep(0.3)
+        return []
+
+
+def test_shutdown_commands_do_not_block_the_loop(monkeypatch):
+    monkeypatch.setattr(daemon, 'ShutdownCountdown', ExpiredCountdown)
+    app = daemon.HeadlessApp.__new__(daemon.HeadlessApp)
+    config = StaticConfig({'sound_enabled': False})
+    config.flush = lambda: None
+    app.config_manager = config
+    app.hooks = PreShutdownHooks([])
+    app.monitor = Stub(triggered_at=None, telemetry=None)
+    app.shutdown_action = BlockingAction()
+    app.countdown = None
+
+    async def run():
+        ticks = 0
+        task = asyncio.ensure_future(app.run_countdown())
+        while not task.done():
+            await asyncio.sleep(0.01)
+            ticks += 1
+        await task
+        return ticks
+
+    ticks = asyncio.run(run())
+    assert app.shutdown_action.thread is not threading.main_thread()
+    assert ticks >= 10
@@ -0,0 +1,39 @@
+"""
+Pre-shutdown hook loading
+A hook that fails to load is skipped, whatever it raises
+"""
+
+import sys
+
+from src.core.hooks import CallableHook, CommandHook, PreShutdownHooks
+from src.core.replay import StaticConfig
+
+
+def test_broken_hooks_are_skipped(tmp_path, monkeypatch):
+    (tmp_path / 'raises_on_import.py').write_text("raise RuntimeError('broken at import')\n")
+    (tmp_path / 'bad_syntax.py').write_text("def hook(:\n")
+    (tmp_path / 'good_hook.py').write_text("def hook():\n    return 'done'\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    config = StaticConfig({'pre_shutdown_hooks': [
+        {'callable': 'raises_on_import:hook'},
+        {'callable': 'bad_syntax:hook'},
+        {'callable': 'good_hook:missing'},
+        {'name': 'no command'},
+        'unterminated "quote',
+        {'callable': 'good_hook:hook'},
+        'echo ok',
+    ]})
+
+    hooks = PreShutdownHooks.from_config(config)
+
+    assert [type(hook) for hook in hooks.configured] == [CallableHook, CommandHook]
+    assert hooks.is_current(config)
+    for name in ('raises_on_import', 'bad_syntax', 'good_hook'):
+        sys.modules.pop(name, None)
+
+
+def test_is_current_follows_setting():
+    hooks = PreShutdownHooks.from_config(StaticConfig({'pre_shutdown_hooks': ['echo a']}))
+    assert hooks.is_current(StaticConfig({'pre_shutdown_hooks': ['echo a']}))
+    assert not hooks.is_current(StaticConfig({'pre_shutdown_hooks': ['echo b']}))
+    assert PreShutdownHooks.from_config(StaticConfig({})).is_current(StaticConfig({'pre_shutdown_hooks': None}))
@@ -0,0 +1,57 @@
+"""
+Single instance guard and activation forwarding without a control socket
+"""
+
+import threading
+
+from src.core import control_client
+from src.core.control import ActivationListener
+from src.core.instance import InstanceLock, forward_activation
+
+
+def test_second_lock_fails_and_reads_pid(tmp_path):
+    path = str(tmp_path / 'instance.lock')
+    first = InstanceLock(path)
+    assert first.acquire()
+    second = InstanceLock(path)
+    assert not second.acquire()
+    assert second.activation_address() is None
+    first.publish(1234, 'abc')
+    assert second.holder_pid() is not None
+    assert second.activation_address() == (1234, 'abc')
+    first.release()
+    assert second.acquire()
+    second.release()
+
+
+def test_activation_over_tcp(core_loop, tmp_path, monkeypatch):
+    monkeypatch.setattr(control_client, 'is_supported', lambda: False)
+    path = str(tmp_path / 'instance.lock')
+    lock = InstanceLock(path)
+    assert lock.acquire()
+    activated = threading.Event()
+    listener = ActivationListener(activated.set)
+    listener.start(lock)
+    try:
+        assert forward_activation(InstanceLock(path))
+        assert activated.wait(2)
+
+        # A wrong token is refused
+        activated.clear()
+        other = InstanceLock(str(tmp_path / 'other.lock'))
+        assert other.acquire()
+        other.publish(listener.port, 'wrong')
+        assert not forward_activation(InstanceLock(str(tmp_path / 'other.lock')))
+        assert not activated.is_set()
+        other.release()
+    finally:
+        listener.stop()
+        lock.release()
+
+
+def test_no_activation_address(tmp_path, monkeypatch):
+    monkeypatch.setattr(control_client, 'is_supported', lambda: False)
+    lock = InstanceLock(str(tmp_path / 'instance.lock'))
+    assert lock.acquire()
+    assert not forward_activation(InstanceLock(str(tmp_path / 'instance.lock')))
+    lock.release()
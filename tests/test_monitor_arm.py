@@ -0,0 +1,79 @@
+"""
+Arming the shutdown delay on request
+On AC power the delay starts when the computer is unplugged, not when it was armed
+"""
+
+import pytest
+
+from src.core.battery import BatterySampler
+from src.core.battery_backends import BatteryBackend, BatterySnapshot
+from src.core.config import ConfigManager, ConfigSnapshot
+from src.core.monitor import BatteryMonitor
+from src.core.replay import StaticConfig, VirtualClock
+from src.core.signals import MonitorSignals
+
+
+class SwitchableBackend(BatteryBackend):
+    """Battery at 20% whose plug state the test sets"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.plugged = True
+
+    def read(self):
+        return BatterySnapshot(20.0, None, self.plugged, self.clock.time())
+
+
+@pytest.fixture
+def monitor():
+    config = ConfigSnapshot(ConfigManager.validate({'enabled': True, 'delay_minutes': 5, 'battery_percent': 50}), 1)
+    clock = VirtualClock(1000.0)
+    monitor = BatteryMonitor(StaticConfig(config), MonitorSignals(), clock=clock,
+                             battery_source=BatterySampler(SwitchableBackend(clock), max_age=0))
+    monitor.triggers_at = []
+    monitor.signals.shutdown_triggered.connect(lambda: monitor.triggers_at.append(clock.now))
+    monitor.wake = lambda: None  # no core loop in these tests
+    return monitor
+
+
+def test_arm_on_ac_starts_delay_when_unplugged(monitor):
+    clock, backend = monitor.clock, monitor.battery_source.backend
+    monitor.evaluate()
+    monitor.arm(2)
+    assert monitor.status()['timer_armed'] and monitor.status()['seconds_to_shutdown'] is None
+
+    # Plugged in for longer than the delay, then unplugged
+    clock.now += 600
+    monitor.evaluate()
+    backend.plugged = False
+    monitor.evaluate()
+    assert monitor.triggers_at == []
+    assert monitor.status()['seconds_to_shutdown'] == 120
+
+    clock.now += 119
+    monitor.evaluate()
+    assert monitor.triggers_at == []
+    clock.now += 1
+    monitor.evaluate()
+    assert monitor.triggers_at == [clock.now]
+
+
+def test_arm_on_battery_starts_now(monitor):
+    monitor.battery_source.backend.plugged = False
+    monitor.evaluate()
+    monitor.clock.now += 10
+    monitor.arm(1)
+    assert monitor.status()['seconds_to_shutdown'] == 60
+    monitor.clock.now += 60
+    monitor.evaluate()
+    assert len(monitor.triggers_at) == 1
+
+
+def test_disarm_on_ac_forgets_armed_delay(monitor):
+    monitor.evaluate()
+    monitor.arm(2)
+    assert monitor.disarm()
+    monitor.battery_source.backend.plugged = False
+    monitor.evaluate()
+    # Back to the normal policy: the configured delay from the unplug
+    assert monitor.status()['seconds_to_shutdown'] == 300
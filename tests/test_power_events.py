@@ -0,0 +1,122 @@
+"""
+Power source change detection against a fake sysfs tree
+Polling mode: one wake per real change, none for a poll without a change
+"""
+
+import os
+import time
+
+import pytest
+
+from src.core.battery import BatterySampler
+from src.core.battery_backends import SysfsBackend
+from src.core.config import ConfigManager, ConfigSnapshot
+from src.core.monitor import BatteryMonitor
+from src.core.power_events import PowerSupplyWatcher, read_power_state
+from src.core.replay import StaticConfig
+from src.core.signals import MonitorSignals
+
+
+POLL_INTERVAL = 0.05
+
+
+def write_attr(root, supply, attr, value):
+    with open(os.path.join(root, supply, attr), 'w') as f:
+        f.write(f"{value}\n")
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    """power_supply tree with a plugged-in AC adapter and a charging battery"""
+    root = str(tmp_path / 'power_supply')
+    for supply, attrs in (('AC', {'type': 'Mains', 'online': 1}),
+                          ('BAT0', {'type': 'Battery', 'status': 'Charging', 'capacity': 80})):
+        os.makedirs(os.path.join(root, supply))
+        for attr, value in attrs.items():
+            write_attr(root, supply, attr, value)
+    return root
+
+
+@pytest.fixture
+def monitor(sysfs):
+    config = ConfigSnapshot(ConfigManager.validate({'enabled': True}), 1)
+    monitor = BatteryMonitor(StaticConfig(config), MonitorSignals(),
+                             battery_source=BatterySampler(SysfsBackend(sysfs)))
+    monitor.wakes = 0
+
+    def wake():
+        monitor.wakes += 1
+    monitor.wake = wake
+    return monitor
+
+
+@pytest.fixture
+def watcher(core_loop, sysfs, monitor):
+    watcher = PowerSupplyWatcher(monitor.on_power_changed, sysfs_root=sysfs, poll_interval=POLL_INTERVAL)
+    watcher.start()
+    yield watcher
+    watcher.stop()
+
+
+def polls(watcher, count=2, timeout=5):
+    """Wait until the watcher has polled count more times"""
+    target = watcher.wakeups + count
+    deadline = time.monotonic() + timeout
+    while watcher.wakeups < target:
+        assert time.monotonic() < deadline, "watcher stopped polling"
+        time.sleep(POLL_INTERVAL / 5)
+
+
+def test_read_power_state(sysfs):
+    assert read_power_state(sysfs) == (('AC', '1'), ('BAT0', 'Charging'))
+    assert read_power_state(os.path.join(sysfs, 'missing')) == ()
+
+
+def test_fake_tree_is_polled(watcher):
+    polls(watcher)
+    assert watcher.mode == 'polling'
+    assert watcher.wakeups >= 2
+
+
+def test_no_change_no_wake(watcher, monitor):
+    polls(watcher, 5)
+    assert watcher.changes == 0 and monitor.wakes == 0
+    assert watcher.stats()['last_latency_ms'] is None
+
+
+def test_each_change_wakes_once(watcher, monitor, sysfs):
+    polls(watcher)
+    write_attr(sysfs, 'AC', 'online', 0)
+    polls(watcher)
+    assert (watcher.changes, monitor.wakes) == (1, 1)
+
+    write_attr(sysfs, 'BAT0', 'status', 'Discharging')
+    polls(watcher)
+    assert (watcher.changes, monitor.wakes) == (2, 2)
+
+    # Rewritten with the same value: no change
+    write_attr(sysfs, 'BAT0', 'status', 'Discharging')
+    polls(watcher)
+    assert (watcher.changes, monitor.wakes) == (2, 2)
+
+    write_attr(sysfs, 'AC', 'online', 1)
+    polls(watcher)
+    assert (watcher.changes, monitor.wakes) == (3, 3)
+
+
+def test_detection_latency_is_recorded(watcher, monitor, sysfs):
+    polls(watcher)
+    write_attr(sysfs, 'AC', 'online', 0)
+    polls(watcher)
+    stats = watcher.stats()
+    assert stats['changes'] == 1
+    # The change can have happened any time since the previous poll
+    assert 0 < stats['last_latency_ms'] <= stats['max_latency_ms'] < 1000
+
+
+def test_change_invalidates_cached_reading(watcher, monitor, sysfs):
+    assert monitor.battery_source.read().power_plugged
+    write_attr(sysfs, 'AC', 'online', 0)
+    polls(watcher)
+    assert monitor.wakes == 1
+    assert not monitor.battery_source.read().power_plugged
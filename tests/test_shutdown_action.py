@@ -0,0 +1,56 @@
+"""
+Shutdown command resolution and failure reporting
+"""
+
+import math
+import sys
+
+from src.core import shutdown
+from src.core.shutdown import ShutdownAction, split_command
+from src.core.telemetry import FLAG_SHUTDOWN, FLAG_SHUTDOWN_FAILED, TelemetryRing
+
+
+def test_split_command_keeps_windows_backslashes(monkeypatch):
+    monkeypatch.setattr(sys, 'platform', 'win32')
+    assert split_command(r'"C:\Program Files\Tools\off.exe" /s /t 0') == [r'C:\Program Files\Tools\off.exe', '/s', '/t', '0']
+    assert split_command(r'C:\Windows\System32\shutdown.exe /s') == [r'C:\Windows\System32\shutdown.exe', '/s']
+
+
+def test_split_command_posix(monkeypatch):
+    monkeypatch.setattr(sys, 'platform', 'linux')
+    assert split_command("sh -c 'echo a b'") == ['sh', '-c', 'echo a b']
+
+
+def test_missing_configured_command_falls_back_to_defaults(monkeypatch):
+    monkeypatch.setattr(shutdown, '_platform_commands', lambda: (['true'],))
+    action = ShutdownAction(['no-such-shutdown-command --now'])
+    assert [argv[1:] for argv in action.commands] == [[]]
+    assert action.commands[0][0].endswith('true')
+
+
+def failures(ring):
+    return [(flags, value) for _, _, _, flags, value in ring.iter_records() if flags & FLAG_SHUTDOWN_FAILED]
+
+
+def test_no_usable_command_is_recorded(tmp_path, monkeypatch):
+    monkeypatch.setattr(shutdown, '_platform_commands', lambda: (['no-such-shutdown-command'],))
+    action = ShutdownAction()
+    ring = TelemetryRing(tmp_path / 'telemetry.bin', capacity=16)
+
+    assert action.execute(triggered_at=0.0, telemetry=ring) == []
+
+    [(flags, delay)] = failures(ring)
+    assert flags & FLAG_SHUTDOWN and delay > 0
+    ring.close()
+
+
+def test_failing_commands_are_recorded(tmp_path):
+    action = ShutdownAction([['false']])
+    ring = TelemetryRing(tmp_path / 'telemetry.bin', capacity=16)
+
+    results = action.execute(triggered_at=0.0, telemetry=ring)
+
+    assert [result.returncode for result in results] == [1]
+    [(flags, value)] = failures(ring)
+    assert math.isnan(value)
+    ring.close()
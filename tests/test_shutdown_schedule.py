@@ -0,0 +1,72 @@
+"""
+Shutdown timing on synthetic discharge curves
+The trigger may come at most one poll interval after the conditions are first met
+"""
+
+import itertools
+
+import pytest
+
+from src.core.monitor import BatteryMonitor
+from src.core.replay import ReplayHarness, synthetic_trace
+
+
+DAY = 24 * 3600
+
+
+def true_trigger(trace, delay_minutes, threshold):
+    """Seconds from the trace start at which the reading first satisfies the policy
+
+    The shutdown delay starts at the first sample on battery after AC power (or at the
+    start of the trace), the reading must also be at or below the threshold.
+    """
+    start = trace[0].timestamp
+    unplugged_at = None
+    for sample, following in zip(trace, trace[1:] + [None]):
+        if sample.plugged:
+            unplugged_at = None
+            continue
+        if unplugged_at is None:
+            unplugged_at = sample.timestamp
+        if sample.percent <= threshold:
+            # The reading holds until the next sample, the delay may expire in between
+            at = max(sample.timestamp, unplugged_at + delay_minutes * 60)
+            if following is None or at < following.timestamp:
+                return at - start
+    return None
+
+
+CURVES = {
+    'steady_slow': [(DAY, False, -5)],
+    'steady_fast': [(DAY, False, -80)],
+    'unplugged_later': [(3600, True, 0), (DAY, False, -20)],
+    'accelerating': [(2 * 3600, False, -5), (3600, False, -20), (DAY, False, -90)],
+    'decelerating': [(1800, False, -60), (DAY, False, -6)],
+    'plateau_then_drop': [(1800, False, -30), (3 * 3600, False, 0), (DAY, False, -40)],
+    'replugged_once': [(1800, False, -40), (1800, True, 30), (DAY, False, -25)],
+}
+
+
+@pytest.mark.parametrize('curve, delay_minutes, threshold', [
+    (curve, delay, threshold)
+    for curve, delay, threshold in itertools.product(sorted(CURVES), (1, 5, 30), (10, 50, 75, 90))
+])
+def test_trigger_follows_crossing_within_poll_interval(curve, delay_minutes, threshold):
+    trace = synthetic_trace(CURVES[curve])
+    expected = true_trigger(trace, delay_minutes, threshold)
+    result = ReplayHarness(trace, {'delay_minutes': delay_minutes, 'battery_percent': threshold}).run()
+
+    if expected is None:
+        assert result.triggered_after is None
+        return
+    assert result.triggered_after is not None, result.log[-500:]
+    late = result.triggered_after - expected
+    assert 0 <= late <= BatteryMonitor.POLL_INTERVAL, f"{late:.1f} s late"
+
+
+def test_sample_steps_between_grid_points():
+    # Odd sample spacing makes the reading's steps irregular, the case predictions get wrong
+    trace = synthetic_trace([(DAY, False, -47)], step=37)
+    expected = true_trigger(trace, 1, 60)
+    result = ReplayHarness(trace, {'delay_minutes': 1, 'battery_percent': 60}).run()
+    assert 0 <= result.triggered_after - expected <= BatteryMonitor.POLL_INTERVAL